@@ -1,6 +1,8 @@
+import os
 from logging.config import fileConfig
 
 from db_dir.db_models import Base
+from dotenv import load_dotenv
 from sqlalchemy import engine_from_config, pool
 
 from alembic import context
@@ -9,6 +11,11 @@ from alembic import context
 # access to the values within the .ini file in use.
 config = context.config
 fileConfig(config.config_file_name)
+
+load_dotenv()
+if os.getenv("DB_CONFIG"):
+    config.set_main_option(
+        "sqlalchemy.url", os.getenv("DB_CONFIG").replace("%", "%%"))
 target_metadata = Base.metadata
 
 # Interpret the config file for Python logging.
@@ -0,0 +1,28 @@
+"""add is_admin to users
+
+Revision ID: 3c5e8a1f0b72
+Revises: dfee98986116
+Create Date: 2026-10-18 10:12:41.503216
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3c5e8a1f0b72'
+down_revision = 'dfee98986116'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column(
+        'is_admin',
+        sa.Boolean(),
+        nullable=False,
+        server_default=sa.false()))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'is_admin')
@@ -0,0 +1,61 @@
+"""add full text search to todos
+
+Revision ID: 5b8e2d7a9c31
+Revises: 7d2f4b9c1e05
+Create Date: 2026-10-18 14:21:45.310266
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2d7a9c31'
+down_revision = '7d2f4b9c1e05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE todos ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), "
+            "'B')) STORED")
+        op.execute(
+            "CREATE INDEX ix_todos_search_vector "
+            "ON todos USING gin (search_vector)")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE todos_fts USING fts5("
+            "title, description, content='todos', content_rowid='id', "
+            "tokenize='porter unicode61')")
+        op.execute(
+            "CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos BEGIN "
+            "INSERT INTO todos_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END")
+        op.execute(
+            "CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos BEGIN "
+            "INSERT INTO todos_fts(todos_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); END")
+        op.execute(
+            "CREATE TRIGGER todos_fts_update "
+            "AFTER UPDATE OF title, description ON todos BEGIN "
+            "INSERT INTO todos_fts(todos_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            "INSERT INTO todos_fts(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END")
+        op.execute("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('ix_todos_search_vector', table_name='todos')
+        op.drop_column('todos', 'search_vector')
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS todos_fts_update")
+        op.execute("DROP TRIGGER IF EXISTS todos_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS todos_fts_insert")
+        op.execute("DROP TABLE IF EXISTS todos_fts")
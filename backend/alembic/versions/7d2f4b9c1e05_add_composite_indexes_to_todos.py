@@ -0,0 +1,28 @@
+"""add composite indexes to todos
+
+Revision ID: 7d2f4b9c1e05
+Revises: 3c5e8a1f0b72
+Create Date: 2026-10-18 11:02:17.884120
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '7d2f4b9c1e05'
+down_revision = '3c5e8a1f0b72'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_todos_owner_id_id', 'todos', ['owner_id', 'id'])
+    op.create_index(
+        'ix_todos_owner_id_completed_priority',
+        'todos',
+        ['owner_id', 'completed', 'priority'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_todos_owner_id_completed_priority', table_name='todos')
+    op.drop_index('ix_todos_owner_id_id', table_name='todos')
@@ -0,0 +1,38 @@
+"""add todo counts
+
+Revision ID: 9e4c6a2f8d13
+Revises: 5b8e2d7a9c31
+Create Date: 2026-10-18 15:06:32.548172
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '9e4c6a2f8d13'
+down_revision = '5b8e2d7a9c31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'todo_counts',
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column('completed', sa.Boolean(), nullable=False),
+        sa.Column('todo_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ['owner_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('owner_id', 'priority', 'completed')
+    )
+    op.execute(
+        "INSERT INTO todo_counts (owner_id, priority, completed, todo_count) "
+        "SELECT owner_id, coalesce(priority, 0), coalesce(completed, false), "
+        "count(*) FROM todos WHERE owner_id IS NOT NULL "
+        "GROUP BY owner_id, coalesce(priority, 0), coalesce(completed, false)")
+
+
+def downgrade() -> None:
+    op.drop_table('todo_counts')
@@ -0,0 +1,40 @@
+"""add revoked tokens
+
+Revision ID: b2f7d4e1a6c8
+Revises: 9e4c6a2f8d13
+Create Date: 2026-10-18 16:38:09.774530
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'b2f7d4e1a6c8'
+down_revision = '9e4c6a2f8d13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jti', sa.String(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('issued_before', sa.Float(), nullable=True),
+        sa.Column('expires_at', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_revoked_tokens_id'), 'revoked_tokens', ['id'])
+    op.create_index(
+        op.f('ix_revoked_tokens_expires_at'), 'revoked_tokens',
+        ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_revoked_tokens_expires_at'), table_name='revoked_tokens')
+    op.drop_index(op.f('ix_revoked_tokens_id'), table_name='revoked_tokens')
+    op.drop_table('revoked_tokens')
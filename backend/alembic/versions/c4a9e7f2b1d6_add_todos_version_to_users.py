@@ -0,0 +1,28 @@
+"""add todos version to users
+
+Revision ID: c4a9e7f2b1d6
+Revises: b2f7d4e1a6c8
+Create Date: 2026-10-18 19:02:17.418825
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c4a9e7f2b1d6'
+down_revision = 'b2f7d4e1a6c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column(
+        'todos_version',
+        sa.Integer(),
+        nullable=False,
+        server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'todos_version')
@@ -0,0 +1,33 @@
+"""add created_at to revoked tokens
+
+Revision ID: d8b3f6a2c9e4
+Revises: c4a9e7f2b1d6
+Create Date: 2026-10-18 20:11:52.207341
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'd8b3f6a2c9e4'
+down_revision = 'c4a9e7f2b1d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('revoked_tokens', sa.Column(
+        'created_at',
+        sa.Float(),
+        nullable=False,
+        server_default='0'))
+    op.create_index(
+        op.f('ix_revoked_tokens_created_at'), 'revoked_tokens',
+        ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_revoked_tokens_created_at'), table_name='revoked_tokens')
+    op.drop_column('revoked_tokens', 'created_at')
@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DB_CONFIG",
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(), "benchmark.db"))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("DB_CREATE_TABLES", "true")
+os.environ.setdefault("DB_ECHO", "false")
+
+import httpx  # noqa: E402
+
+from main import app  # noqa: E402
+
+USERNAME = "benchmark"
+PASSWORD = "benchmark"
+
+
+async def seed(client: httpx.AsyncClient, todos: int) -> dict:
+    await client.post("/api/v1/auth/create_user", json={
+        "username": USERNAME,
+        "email": "benchmark@example.com",
+        "phone_number": None,
+        "first_name": "Bench",
+        "last_name": "Mark",
+        "password": PASSWORD,
+    })
+    response = await client.post(
+        "/api/v1/auth/token",
+        data={"username": USERNAME, "password": PASSWORD})
+    headers = {"Authorization": f"Bearer {response.json()['Your token']}"}
+    for number in range(todos):
+        await client.post("/api/v1/todos/", headers=headers, json={
+            "title": f"todo {number}",
+            "description": "benchmark",
+            "priority": number % 5 + 1,
+        })
+    return headers
+
+
+async def run(requests: int, concurrency: int, todos: int) -> dict:
+    await app.router.startup()
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        headers = await seed(client, todos)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(number: int):
+            async with semaphore:
+                todo_id = number % todos + 1
+                response = await client.get(
+                    f"/api/v1/todos/{todo_id}", headers=headers)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(fetch(number) for number in range(requests)))
+        elapsed = time.perf_counter() - started
+    await app.router.shutdown()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(requests / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Concurrent read throughput of the todos API")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--todos", type=int, default=100)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.requests, args.concurrency, args.todos))
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import asyncio
+import sys
+
+from services.todo_events import LocalEventBackend, TodoEventBroker
+
+STREAM_LIFETIME = 0.05
+
+
+def make_broker(history_size: int = 10) -> TodoEventBroker:
+    return TodoEventBroker(
+        backend=LocalEventBackend(),
+        history_size=history_size,
+        history_users=10,
+        queue_size=10,
+        heartbeat=1,
+        stream_lifetime=STREAM_LIFETIME,
+        retry=1000,
+    )
+
+
+async def read_stream(broker, user_id: int, last_event_id=None) -> tuple:
+    events = []
+    position = None
+    async for message in broker.stream(user_id, last_event_id):
+        fields = {
+            name: value.strip()
+            for name, _, value in (
+                line.partition(":") for line in message.strip().split("\n"))
+            if name
+        }
+        if "event" in fields:
+            events.append(fields["event"])
+        if "id" in fields:
+            position = fields["id"]
+    return events, position
+
+
+async def reconnect_without_history() -> bool:
+    broker = make_broker()
+    await broker.start()
+    _, position = await read_stream(broker, 1)
+    await broker.publish(1, "created", 1)
+    events, _ = await read_stream(broker, 1, position)
+    return bool(position) and events == ["created"]
+
+
+async def reconnect_after_event() -> bool:
+    broker = make_broker()
+    await broker.start()
+    await broker.publish(1, "created", 1)
+    _, position = await read_stream(broker, 1)
+    await broker.publish(1, "updated", 1)
+    await broker.publish(1, "deleted", 1)
+    events, _ = await read_stream(broker, 1, position)
+    return events == ["updated", "deleted"]
+
+
+async def reconnect_after_trimmed_history() -> bool:
+    broker = make_broker(history_size=2)
+    await broker.start()
+    _, position = await read_stream(broker, 1)
+    for todo_id in range(3):
+        await broker.publish(1, "created", todo_id)
+    events, _ = await read_stream(broker, 1, position)
+    return events == ["reset"]
+
+
+async def reconnect_with_unknown_id() -> bool:
+    broker = make_broker()
+    await broker.start()
+    await broker.publish(1, "created", 1)
+    events, _ = await read_stream(broker, 1, "unknown")
+    return events == ["reset"]
+
+
+CHECKS = (
+    reconnect_without_history,
+    reconnect_after_event,
+    reconnect_after_trimmed_history,
+    reconnect_with_unknown_id,
+)
+
+
+async def run() -> bool:
+    passed = True
+    for check in CHECKS:
+        ok = await check()
+        passed = passed and ok
+        print(f"{'ok' if ok else 'FAIL'} {check.__name__}")
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(run()) else 1)
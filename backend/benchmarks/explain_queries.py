@@ -0,0 +1,68 @@
+import asyncio
+import os
+import sys
+import tempfile
+
+USE_TEMPORARY_DB = "DB_CONFIG" not in os.environ
+if USE_TEMPORARY_DB:
+    os.environ["DB_CONFIG"] = \
+        "sqlite:///" + os.path.join(tempfile.mkdtemp(), "explain.db")
+os.environ.setdefault("DB_ECHO", "false")
+
+from sqlalchemy import select, text  # noqa: E402
+
+from db_dir.db import dispose_engine, init_engine  # noqa: E402
+from db_dir.db_models import Base, Todos  # noqa: E402
+
+HOT_QUERIES = {
+    "todos_by_owner_page": (
+        select(Todos).where(Todos.owner_id == 1).where(Todos.id > 0)
+        .order_by(Todos.id).limit(51),
+        "ix_todos_owner_id_id",
+    ),
+    "todo_by_id_and_owner": (
+        select(Todos).where(Todos.id == 1).where(Todos.owner_id == 1),
+        None,
+    ),
+    "open_todos_by_priority": (
+        select(Todos).where(Todos.owner_id == 1)
+        .where(Todos.completed.is_(False)).order_by(Todos.priority),
+        "ix_todos_owner_id_completed_priority",
+    ),
+}
+FULL_SCAN_MARKERS = ("SCAN todos", "Seq Scan on todos")
+
+
+async def explain(connection, query) -> str:
+    sql = str(query.compile(
+        dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "postgresql":
+        await connection.execute(text("SET enable_seqscan = off"))
+        rows = await connection.execute(text("EXPLAIN " + sql))
+    else:
+        rows = await connection.execute(text("EXPLAIN QUERY PLAN " + sql))
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def uses_index(plan: str, index_name) -> bool:
+    if index_name is not None:
+        return index_name in plan
+    return not any(marker in plan for marker in FULL_SCAN_MARKERS)
+
+
+async def run() -> bool:
+    passed = True
+    async with init_engine().connect() as connection:
+        if USE_TEMPORARY_DB:
+            await connection.run_sync(Base.metadata.create_all)
+        for name, (query, index_name) in HOT_QUERIES.items():
+            plan = await explain(connection, query)
+            ok = uses_index(plan, index_name)
+            passed = passed and ok
+            print(f"{'ok' if ok else 'FAIL'} {name}: {plan}")
+    await dispose_engine()
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(run()) else 1)
@@ -0,0 +1,333 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+
+os.environ.setdefault(
+    "DB_CONFIG",
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(), "load.db"))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("DB_CREATE_TABLES", "true")
+os.environ.setdefault("DB_ECHO", "false")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from db_dir import db  # noqa: E402
+from db_dir.db_models import Todos, Users  # noqa: E402
+from main import create_app  # noqa: E402
+from routers.api.auth_api import create_access_token  # noqa: E402
+from services.passwords import hash_password  # noqa: E402
+
+PASSWORD = "benchmark"
+PERCENTILES = (50, 95, 99)
+
+
+class VirtualUser:
+    def __init__(self, user_id: int, username: str, todo_ids: list) -> None:
+        self.id = user_id
+        self.username = username
+        self.todo_ids = todo_ids
+        token = create_access_token(
+            username, user_id, expires_delta=timedelta(hours=1))
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.cookies = {"access_token": token}
+
+
+async def seed(users: int, todos_per_user: int) -> list:
+    prefix = f"load-{uuid.uuid4().hex[:8]}"
+    hashed_password = hash_password(PASSWORD)
+    async with db.Session() as session:
+        await session.execute(insert(Users), [{
+            "username": f"{prefix}-{number}",
+            "email": f"{prefix}-{number}@example.com",
+            "first_name": "Load",
+            "last_name": "Test",
+            "hashed_password": hashed_password,
+            "is_active": True,
+        } for number in range(users)])
+        owners = (await session.execute(
+            select(Users.id, Users.username)
+            .where(Users.username.like(f"{prefix}-%")))).all()
+        await session.execute(insert(Todos), [{
+            "title": f"todo {number}",
+            "description": "load test",
+            "priority": number % 5 + 1,
+            "completed": number % 3 == 0,
+            "owner_id": owner_id,
+        } for owner_id, _ in owners for number in range(todos_per_user)])
+        todos = (await session.execute(
+            select(Todos.id, Todos.owner_id)
+            .where(Todos.owner_id.in_([owner_id for owner_id, _ in owners]))
+        )).all()
+        await session.commit()
+    todo_ids = {owner_id: [] for owner_id, _ in owners}
+    for todo_id, owner_id in todos:
+        todo_ids[owner_id].append(todo_id)
+    return [
+        VirtualUser(owner_id, username, todo_ids[owner_id])
+        for owner_id, username in owners
+    ]
+
+
+def random_todo(rng: random.Random) -> dict:
+    return {
+        "title": f"load {rng.randrange(10 ** 6)}",
+        "description": "load test",
+        "priority": rng.randint(1, 5),
+        "completed": rng.random() < 0.3,
+    }
+
+
+async def api_login(client, user, rng):
+    return await client.post(
+        "/api/v1/auth/token",
+        data={"username": user.username, "password": PASSWORD})
+
+
+async def api_list_todos(client, user, rng):
+    return await client.get("/api/v1/todos/user", headers=user.headers)
+
+
+async def api_read_todo(client, user, rng):
+    return await client.get(
+        f"/api/v1/todos/{rng.choice(user.todo_ids)}", headers=user.headers)
+
+
+async def api_create_todo(client, user, rng):
+    return await client.post(
+        "/api/v1/todos/", headers=user.headers, json=random_todo(rng))
+
+
+async def api_update_todo(client, user, rng):
+    return await client.put(
+        f"/api/v1/todos/{rng.choice(user.todo_ids)}",
+        headers=user.headers, json=random_todo(rng))
+
+
+async def api_delete_todo(client, user, rng):
+    todo_id = user.todo_ids.pop() if len(user.todo_ids) > 1 \
+        else user.todo_ids[0]
+    return await client.delete(
+        f"/api/v1/todos/{todo_id}", headers=user.headers)
+
+
+async def api_list_users(client, user, rng):
+    return await client.get("/api/v1/users/", headers=user.headers)
+
+
+async def api_read_user(client, user, rng):
+    return await client.get(f"/api/v1/users/user/{user.id}")
+
+
+async def api_create_address(client, user, rng):
+    return await client.post("/api/v1/address/", headers=user.headers, json={
+        "address1": f"{rng.randrange(1000)} Load street",
+        "city": "Benchmark",
+        "country": "Nowhere",
+        "postalcode": "00000",
+    })
+
+
+async def html_home(client, user, rng):
+    return await client.get("/todos/", cookies=user.cookies)
+
+
+async def html_edit_form(client, user, rng):
+    return await client.get(
+        f"/todos/edit-todo/{rng.choice(user.todo_ids)}", cookies=user.cookies)
+
+
+async def html_complete(client, user, rng):
+    return await client.get(
+        f"/todos/complete/{rng.choice(user.todo_ids)}", cookies=user.cookies)
+
+
+async def html_login_page(client, user, rng):
+    return await client.get("/auth/")
+
+
+MIXES = {
+    "default": {
+        api_list_todos: 25,
+        api_read_todo: 15,
+        api_create_todo: 8,
+        api_update_todo: 6,
+        api_delete_todo: 2,
+        api_read_user: 8,
+        api_list_users: 2,
+        api_create_address: 1,
+        api_login: 1,
+        html_home: 20,
+        html_edit_form: 4,
+        html_complete: 4,
+        html_login_page: 4,
+    },
+    "read-heavy": {
+        api_list_todos: 40,
+        api_read_todo: 25,
+        api_read_user: 10,
+        html_home: 25,
+    },
+    "write-heavy": {
+        api_create_todo: 35,
+        api_update_todo: 35,
+        api_delete_todo: 10,
+        html_complete: 20,
+    },
+}
+
+
+def percentile(values: list, rank: int) -> float:
+    index = round(rank / 100 * (len(values) - 1))
+    return values[min(len(values) - 1, index)]
+
+
+def summarize(latencies: list, errors: int, seconds: float) -> dict:
+    latencies = sorted(latencies)
+    summary = {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / seconds, 1),
+    }
+    for rank in PERCENTILES:
+        summary[f"p{rank}_ms"] = round(
+            percentile(latencies, rank) * 1000, 3) if latencies else None
+    return summary
+
+
+async def drive(client, users, mix, requests, concurrency, seed_value):
+    scenarios = list(mix)
+    weights = list(mix.values())
+    latencies = {scenario.__name__: [] for scenario in scenarios}
+    errors = dict.fromkeys(latencies, 0)
+    remaining = iter(range(requests))
+
+    async def worker(number):
+        rng = random.Random(f"{seed_value}-{number}")
+        for _ in remaining:
+            scenario = rng.choices(scenarios, weights)[0]
+            started = time.perf_counter()
+            response = await scenario(client, rng.choice(users), rng)
+            latencies[scenario.__name__].append(
+                time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors[scenario.__name__] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    seconds = time.perf_counter() - started
+    report = summarize(
+        [value for values in latencies.values() for value in values],
+        sum(errors.values()), seconds)
+    report["seconds"] = round(seconds, 3)
+    report["scenarios"] = {
+        name: summarize(values, errors[name], seconds)
+        for name, values in latencies.items() if values
+    }
+    return report
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    app = None
+    if args.url is None:
+        app = create_app()
+        await app.router.startup()
+    else:
+        db.init_engine()
+    users = await seed(args.users, args.todos_per_user)
+    async with httpx.AsyncClient(
+            app=app, base_url=args.url or "http://test") as client:
+        report = await drive(
+            client, users, MIXES[args.mix],
+            args.requests, args.concurrency, args.seed)
+    dialect = db.engine.dialect.name
+    if app is not None:
+        await app.router.shutdown()
+    else:
+        await db.dispose_engine()
+    return {
+        "meta": {
+            "commit": get_commit(),
+            "python": platform.python_version(),
+            "database": dialect,
+            "target": args.url or "in-process",
+            "mix": args.mix,
+            "users": args.users,
+            "todos_per_user": args.todos_per_user,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "results": report,
+    }
+
+
+def compare(baseline: dict, current: dict) -> list:
+    lines = []
+    old_scenarios = baseline["results"]["scenarios"]
+    new_scenarios = dict(current["results"]["scenarios"])
+    new_scenarios["TOTAL"] = current["results"]
+    old_scenarios = dict(old_scenarios, TOTAL=baseline["results"])
+    for name, new in new_scenarios.items():
+        old = old_scenarios.get(name)
+        if old is None:
+            continue
+        changes = []
+        for key in ("throughput", "p50_ms", "p95_ms", "p99_ms"):
+            if old[key] and new[key] is not None:
+                delta = (new[key] - old[key]) / old[key] * 100
+                changes.append(
+                    f"{key} {old[key]} -> {new[key]} ({delta:+.1f}%)")
+        lines.append(f"{name}: " + ", ".join(changes))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load test of the API and HTML routers")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--todos-per-user", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--url", help="hit a running server instead of the in-process app")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to diff")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        print("\n".join(compare(baseline, report)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import timedelta
+
+os.environ.setdefault(
+    "DB_CONFIG",
+    "sqlite:///" + os.path.join(tempfile.mkdtemp(), "budgets.db"))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("DB_CREATE_TABLES", "true")
+os.environ.setdefault("DB_ECHO", "false")
+os.environ.setdefault("TODO_CACHE_ENABLED", "false")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from db_dir import db  # noqa: E402
+from db_dir.db_models import Todos, Users  # noqa: E402
+from db_dir.instrumentation import assert_max_queries  # noqa: E402
+from main import create_app  # noqa: E402
+from routers.api.auth_api import create_access_token  # noqa: E402
+
+TODOS = 30
+TODO = {"title": "budget", "description": "d", "priority": 3}
+
+ENDPOINT_BUDGETS = (
+    ("GET", "/api/v1/todos/", None, 1),
+    ("GET", "/api/v1/todos/user", None, 2),
+    ("GET", "/api/v1/todos/1", None, 1),
+    ("GET", "/api/v1/todos/search?q=todo", None, 1),
+    ("GET", "/api/v1/todos/stats", None, 1),
+    ("POST", "/api/v1/todos/", TODO, 3),
+    ("PUT", "/api/v1/todos/1", TODO, 4),
+    ("POST", "/api/v1/todos/batch", {"operations": [
+        {"op": "create", "todo": TODO},
+        {"op": "update", "id": 2, "todo": TODO},
+        {"op": "delete", "id": 3},
+    ]}, 6),
+    ("DELETE", "/api/v1/todos/4", None, 4),
+    ("GET", "/api/v1/users/", None, 1),
+    ("GET", "/api/v1/users/user/1", None, 1),
+    ("GET", "/api/v1/users/me/profile", None, 2),
+    ("GET", "/todos/", None, 1),
+    ("GET", "/todos/edit-todo/1", None, 1),
+    ("GET", "/todos/complete/5", None, 4),
+)
+
+
+async def seed() -> dict:
+    async with db.Session() as session:
+        await session.execute(insert(Users), [{
+            "username": "budget",
+            "email": "budget@example.com",
+            "hashed_password": "unused",
+            "is_active": True,
+        }])
+        await session.execute(insert(Todos), [{
+            "title": f"todo {number}",
+            "priority": number % 5 + 1,
+            "completed": False,
+            "owner_id": 1,
+        } for number in range(TODOS)])
+        await session.commit()
+    token = create_access_token(
+        "budget", 1, expires_delta=timedelta(hours=1))
+    return {
+        "Authorization": f"Bearer {token}",
+        "Cookie": f"access_token={token}",
+    }
+
+
+async def run() -> bool:
+    app = create_app()
+    await app.router.startup()
+    headers = await seed()
+    passed = True
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        for method, path, body, budget in ENDPOINT_BUDGETS:
+            try:
+                with assert_max_queries(budget) as stats:
+                    response = await client.request(
+                        method, path, headers=headers, json=body)
+                ok = response.status_code < 400
+                message = f"status {response.status_code}"
+            except AssertionError as error:
+                ok = False
+                message = str(error)
+            passed = passed and ok
+            print(f"{'ok' if ok else 'FAIL'} {method} {path}: "
+                  f"{stats.count}/{budget} queries, {message}")
+    await app.router.shutdown()
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(run()) else 1)
@@ -0,0 +1,72 @@
+import argparse
+import asyncio
+import json
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from db_dir.db_models import Todos
+from db_dir.pydantic_models import TodoPage, TodoResponse
+from services.serialization import page_response
+
+TODOS = 1000
+
+
+def make_page() -> dict:
+    return {
+        "items": [
+            Todos(
+                id=number, title=f"todo {number}", description="benchmark",
+                priority=number % 5 + 1, completed=number % 3 == 0,
+                owner_id=1)
+            for number in range(TODOS)
+        ],
+        "next_cursor": None,
+    }
+
+
+def untyped(page: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(page)).body
+
+
+def typed(page: dict, field) -> bytes:
+    content = asyncio.run(
+        serialize_response(field=field, response_content=page))
+    return ORJSONResponse(content).body
+
+
+def projected(page: dict) -> bytes:
+    return page_response(TodoResponse, page).body
+
+
+def run(number: int) -> dict:
+    page = make_page()
+    field = create_response_field(name="Response_todos", type_=TodoPage)
+    serializers = {
+        "generic_encoder_json": lambda: untyped(page),
+        "response_model_orjson": lambda: typed(page, field),
+        "page_response_orjson": lambda: projected(page),
+    }
+    bodies = [json.loads(serialize()) for serialize in serializers.values()]
+    if any(body != bodies[0] for body in bodies):
+        raise SystemExit("serialized pages differ")
+    results = {}
+    for name, serialize in serializers.items():
+        seconds = min(timeit.repeat(serialize, number=number, repeat=5))
+        results[name] = {"ms_per_1000_todos": seconds / number * 1000}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serialization cost of a page of 1,000 todos")
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.number), indent=2))
+
+
+if __name__ == "__main__":
+    main()
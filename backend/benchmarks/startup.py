@@ -0,0 +1,81 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def measure() -> dict:
+    started = time.perf_counter()
+    import httpx
+
+    from main import create_app
+    imported = time.perf_counter()
+
+    async def boot():
+        app = create_app()
+        await app.router.startup()
+        booted = time.perf_counter()
+        async with httpx.AsyncClient(
+                app=app, base_url="http://test") as client:
+            response = await client.get("/auth/")
+            response.raise_for_status()
+        first_request = time.perf_counter()
+        await app.router.shutdown()
+        return booted, first_request
+
+    booted, first_request = asyncio.run(boot())
+    return {
+        "import_seconds": imported - started,
+        "startup_seconds": booted - imported,
+        "first_request_seconds": first_request - booted,
+        "total_seconds": first_request - started,
+    }
+
+
+def run(runs: int) -> dict:
+    environment = dict(os.environ)
+    environment.setdefault(
+        "DB_CONFIG",
+        "sqlite:///" + os.path.join(tempfile.mkdtemp(), "startup.db"))
+    environment.setdefault("SECRET_KEY", "benchmark-secret-key")
+    environment.setdefault("DB_ECHO", "false")
+    environment.setdefault("DB_CREATE_TABLES", "true")
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child"],
+            env=environment, check=True, capture_output=True, text=True
+        ).stdout
+        sample = json.loads(output)
+        sample["process_seconds"] = time.perf_counter() - started
+        samples.append(sample)
+    return {
+        "runs": runs,
+        **{
+            key: round(statistics.median(
+                sample[key] for sample in samples), 4)
+            for key in samples[0]
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cold-start latency of a fresh app process (medians)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(measure()))
+    else:
+        print(json.dumps(run(args.runs)))
+
+
+if __name__ == "__main__":
+    main()
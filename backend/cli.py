@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import csv
+import os
+import sys
+
+from db_dir.db import Session, dispose_engine, init_engine
+from services.todo_stats import reconcile_todo_counts
+from services.user_import import import_users
+
+
+async def reconcile_stats(args) -> None:
+    init_engine()
+    try:
+        async with Session() as db:
+            rows = await reconcile_todo_counts(db, args.user_id)
+            await db.commit()
+    finally:
+        await dispose_engine()
+    print(f"Rebuilt {rows} todo count rows")
+
+
+def write_error_report(errors: list, output) -> None:
+    writer = csv.writer(output)
+    writer.writerow(["line", "username", "error"])
+    writer.writerows(errors)
+
+
+async def import_users_command(args) -> None:
+    file_format = args.format or (
+        "csv" if args.path.lower().endswith(".csv") else "ndjson")
+    init_engine()
+    try:
+        async with Session() as db:
+            imported, errors = await import_users(
+                db, args.path, file_format, args.batch_size, args.workers)
+    finally:
+        await dispose_engine()
+    if args.report:
+        with open(args.report, "w", newline="") as report:
+            write_error_report(errors, report)
+    else:
+        write_error_report(errors, sys.stdout)
+    print(f"Imported {imported} users, {len(errors)} rows failed",
+          file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Todo app maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    reconcile = commands.add_parser(
+        "reconcile-stats",
+        help="rebuild the per-user todo counters from the todos table")
+    reconcile.add_argument(
+        "--user-id", type=int, help="only rebuild this user's counters")
+    reconcile.set_defaults(handler=reconcile_stats)
+    importer = commands.add_parser(
+        "import-users", help="create users in bulk from CSV or NDJSON")
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=["csv", "ndjson"])
+    importer.add_argument("--batch-size", type=int, default=5000)
+    importer.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="password hashing processes")
+    importer.add_argument(
+        "--report", help="write the per-row error report here (CSV)")
+    importer.set_defaults(handler=import_users_command)
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
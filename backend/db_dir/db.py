@@ -1,19 +1,119 @@
 import os
+import time
 
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-load_dotenv()
+from db_dir.instrumentation import instrument_engine
+from settings import env_flag
 
-engine = create_engine(os.getenv("DB_CONFIG"), echo=True)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
-Session = sessionmaker(bind=engine)
 
+def get_async_url(url: str) -> str:
+    scheme, separator, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
 
-def get_db():
-    try:
-        db = Session()
+
+class PoolStats:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            raise
+        finally:
+            pool_stats.record_wait(time.perf_counter() - started)
+
+
+def get_engine_options(url: str) -> dict:
+    options = {
+        "echo": env_flag("DB_ECHO", "true"),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "-1")),
+        "pool_pre_ping": env_flag("DB_POOL_PRE_PING", "false"),
+    }
+    url = make_url(url)
+    in_memory = url.get_backend_name() == "sqlite" \
+        and url.database in (None, "", ":memory:")
+    if not in_memory:
+        options.update({
+            "poolclass": InstrumentedQueuePool,
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        })
+    return options
+
+
+engine = None
+
+Session = sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+
+def init_engine():
+    global engine
+    if engine is None:
+        database_url = get_async_url(os.getenv("DB_CONFIG"))
+        engine = create_async_engine(
+            database_url, **get_engine_options(database_url))
+        instrument_engine(engine)
+        Session.configure(bind=engine)
+    return engine
+
+
+async def dispose_engine() -> None:
+    global engine
+    if engine is not None:
+        await engine.dispose()
+        engine = None
+
+
+async def get_db():
+    async with Session() as db:
         yield db
-    finally:
-        db.close()
+
+
+def get_pool_status() -> dict:
+    if engine is None:
+        return {"pool": None}
+    pool = engine.pool
+    status = {
+        "pool": type(pool).__name__,
+        "checkouts": pool_stats.checkouts,
+        "checkout_timeouts": pool_stats.timeouts,
+        "wait_seconds_total": round(pool_stats.wait_seconds, 6),
+        "wait_seconds_max": round(pool_stats.max_wait_seconds, 6),
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "timeout": pool.timeout(),
+        })
+    return status
@@ -1,4 +1,5 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import (Boolean, Column, Float, ForeignKey, Index, Integer,
+                        String, false)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -15,6 +16,10 @@ class Users(Base):
     last_name = Column(String)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
+    is_admin = Column(
+        Boolean, nullable=False, default=False, server_default=false())
+    todos_version = Column(
+        Integer, nullable=False, default=0, server_default="0")
     phone_number = Column(String)
     address_id = Column(Integer, ForeignKey("address.id"), nullable=True)
 
@@ -24,6 +29,13 @@ class Users(Base):
 
 class Todos(Base):
     __tablename__ = "todos"
+    __table_args__ = (
+        Index("ix_todos_owner_id_id", "owner_id", "id"),
+        Index(
+            "ix_todos_owner_id_completed_priority",
+            "owner_id", "completed", "priority"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
@@ -34,6 +46,27 @@ class Todos(Base):
     owner = relationship("Users", back_populates="todos")
 
 
+class TodoCounts(Base):
+    __tablename__ = "todo_counts"
+
+    owner_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    priority = Column(Integer, primary_key=True)
+    completed = Column(Boolean, primary_key=True)
+    todo_count = Column(Integer, nullable=False, default=0)
+
+
+class RevokedTokens(Base):
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String, nullable=True)
+    user_id = Column(Integer, nullable=True)
+    issued_before = Column(Float, nullable=True)
+    expires_at = Column(Float, nullable=False, index=True)
+    created_at = Column(Float, nullable=False, index=True)
+
+
 class Address(Base):
     __tablename__ = "address"
 
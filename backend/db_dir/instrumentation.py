@@ -0,0 +1,95 @@
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET = int(os.getenv("DB_QUERY_BUDGET", "20"))
+REPEATED_QUERY_LIMIT = int(os.getenv("DB_REPEATED_QUERY_LIMIT", "5"))
+
+
+class QueryStats:
+    def __init__(self, parent=None) -> None:
+        self.parent = parent
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+    def repeated(self, limit: int = REPEATED_QUERY_LIMIT) -> dict:
+        return {
+            statement: times
+            for statement, times in self.statements.items() if times > limit
+        }
+
+
+current_query_stats = ContextVar("current_query_stats", default=None)
+
+
+def before_cursor_execute(
+    connection, cursor, statement, parameters, context, executemany
+):
+    connection.info.setdefault("query_started", []).append(
+        time.perf_counter())
+
+
+def after_cursor_execute(
+    connection, cursor, statement, parameters, context, executemany
+):
+    elapsed = time.perf_counter() - connection.info["query_started"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def instrument_engine(engine) -> None:
+    event.listen(
+        engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(
+        engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+def check_query_budget(
+    name: str,
+    stats: QueryStats,
+    budget: int = QUERY_BUDGET,
+    repeat_limit: int = REPEATED_QUERY_LIMIT
+) -> None:
+    if stats.count > budget:
+        logger.warning(
+            "%s ran %d SQL statements in %.1f ms, budget is %d",
+            name, stats.count, stats.seconds * 1000, budget)
+    for statement, times in stats.repeated(repeat_limit).items():
+        logger.warning(
+            "%s ran the same statement %d times, possible N+1: %s",
+            name, times, " ".join(statement.split()))
+
+
+@contextmanager
+def assert_max_queries(
+    max_count: int, repeat_limit: int = REPEATED_QUERY_LIMIT
+):
+    stats = QueryStats(current_query_stats.get())
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+    if stats.count > max_count:
+        raise AssertionError(
+            f"{stats.count} SQL statements ran, expected at most {max_count}")
+    repeated = stats.repeated(repeat_limit)
+    if repeated:
+        raise AssertionError(f"Repeated SQL statements (N+1): {repeated}")
@@ -0,0 +1,29 @@
+import os
+
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_head_revision() -> str:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option(
+        "script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def get_current_revision(connection) -> str:
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+async def check_migrations(engine) -> None:
+    async with engine.connect() as connection:
+        current = await connection.run_sync(get_current_revision)
+    head = get_head_revision()
+    if current != head:
+        raise RuntimeError(
+            f"Database is at revision {current}, expected {head}. "
+            "Run 'alembic upgrade head' first."
+        )
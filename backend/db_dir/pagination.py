@@ -0,0 +1,85 @@
+import base64
+import json
+import os
+from typing import Optional
+
+from fastapi import Query
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from exceptions import invalid_cursor_exception
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_PAGE_SIZE, gt=0, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None
+    ) -> None:
+        self.limit = limit
+        self.cursor = cursor
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise invalid_cursor_exception()
+    if not isinstance(values, list) or len(values) != size or not all(
+            value is None or isinstance(value, int)
+            for value in values[:-1]) or not isinstance(values[-1], int):
+        raise invalid_cursor_exception()
+    return values
+
+
+def order_clauses(columns: list, descending: bool) -> list:
+    *leading, unique = columns
+    if descending:
+        return [column.desc().nulls_first() for column in leading] \
+            + [unique.desc()]
+    return [column.asc().nulls_last() for column in leading] + [unique]
+
+
+def keyset_condition(columns: list, values: list, descending: bool):
+    column, value = columns[0], values[0]
+    if len(columns) == 1:
+        return column < value if descending else column > value
+    rest = keyset_condition(columns[1:], values[1:], descending)
+    if value is None:
+        after = and_(column.is_(None), rest)
+        return or_(after, column.is_not(None)) if descending else after
+    after = or_(
+        column < value if descending else column > value,
+        and_(column == value, rest))
+    return after if descending else or_(after, column.is_(None))
+
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    model,
+    page: PageParams,
+    order_columns: tuple = (),
+    descending: bool = False
+) -> dict:
+    columns = [*order_columns, model.id]
+    if page.cursor is not None:
+        values = decode_cursor(page.cursor, len(columns))
+        query = query.where(keyset_condition(columns, values, descending))
+    query = query.order_by(*order_clauses(columns, descending))
+    items = (await db.scalars(query.limit(page.limit + 1))).all()
+    next_cursor = None
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        next_cursor = encode_cursor(
+            [getattr(items[-1], column.key) for column in columns])
+    return {"items": items, "next_cursor": next_cursor}
@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, root_validator, validator
 
 
 class CreateUser(BaseModel):
@@ -26,6 +26,60 @@ class Todo(BaseModel):
     completed: bool = False
 
 
+class TodoResponse(BaseModel):
+    id: int
+    title: str
+    description: Optional[str]
+    priority: int
+    completed: bool
+    owner_id: int
+
+    class Config:
+        orm_mode = True
+
+
+class TodoPage(BaseModel):
+    items: List[TodoResponse]
+    next_cursor: Optional[str]
+
+
+class TodoSearchResults(BaseModel):
+    items: List[TodoResponse]
+
+
+class TodoStatsResponse(BaseModel):
+    total: int
+    open: int
+    completed: int
+    by_priority: Dict[str, int]
+
+
+class TodoOperation(BaseModel):
+    op: str = Field(regex="^(create|update|delete)$")
+    id: Optional[int]
+    todo: Optional[Todo]
+
+    @root_validator(skip_on_failure=True)
+    def check_fields(cls, values):
+        if values["op"] != "create" and values.get("id") is None:
+            raise ValueError(f"id is required for {values['op']}")
+        if values["op"] != "delete" and values.get("todo") is None:
+            raise ValueError(f"todo is required for {values['op']}")
+        return values
+
+
+class TodoBatch(BaseModel):
+    operations: List[TodoOperation] = Field(min_items=1, max_items=1000)
+
+    @validator("operations")
+    def check_unique_ids(cls, operations):
+        ids = [operation.id for operation in operations
+               if operation.op != "create"]
+        if len(ids) != len(set(ids)):
+            raise ValueError("each todo id may appear only once per batch")
+        return operations
+
+
 class AddressPydantic(BaseModel):
     address1: str
     address2: Optional[str]
@@ -34,3 +88,35 @@ class AddressPydantic(BaseModel):
     country: str
     postalcode: str
     apt_num: Optional[str]
+
+
+class AddressResponse(AddressPydantic):
+    id: int
+
+    class Config:
+        orm_mode = True
+
+
+class UserResponse(BaseModel):
+    id: int
+    username: str
+    email: Optional[str]
+    first_name: Optional[str]
+    last_name: Optional[str]
+    phone_number: Optional[str]
+    is_active: bool
+    address_id: Optional[int]
+
+    class Config:
+        orm_mode = True
+
+
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str]
+
+
+class UserProfileResponse(BaseModel):
+    user: UserResponse
+    address: Optional[AddressResponse]
+    todos: TodoPage
@@ -0,0 +1,79 @@
+from sqlalchemy import (DDL, column, event, func, literal_column, or_, select,
+                        table)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_dir.db_models import Todos
+
+SEARCH_CONFIG = "english"
+
+POSTGRES_SEARCH_DDL = (
+    "ALTER TABLE todos ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), "
+    "'B')) STORED",
+    "CREATE INDEX ix_todos_search_vector ON todos USING gin (search_vector)",
+)
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE todos_fts USING fts5("
+    "title, description, content='todos', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos BEGIN "
+    "INSERT INTO todos_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER todos_fts_update AFTER UPDATE OF title, description "
+    "ON todos BEGIN "
+    "INSERT INTO todos_fts(todos_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO todos_fts(rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+)
+
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(
+        Todos.__table__, "after_create",
+        DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        Todos.__table__, "after_create",
+        DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Todos.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS todos_fts").execute_if(dialect="sqlite"))
+
+todos_fts = table("todos_fts", column("rowid"))
+
+
+def fts5_query(terms: list) -> str:
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def search_query(dialect: str, owner_id: int, q: str, limit: int):
+    query = select(Todos).where(Todos.owner_id == owner_id).limit(limit)
+    if dialect == "postgresql":
+        vector = literal_column("todos.search_vector")
+        ts_query = func.websearch_to_tsquery(
+            literal_column(f"'{SEARCH_CONFIG}'"), q)
+        return query.where(vector.op("@@")(ts_query)).order_by(
+            func.ts_rank_cd(vector, ts_query).desc(), Todos.id)
+    if dialect == "sqlite":
+        fts = literal_column("todos_fts")
+        return query.join(todos_fts, todos_fts.c.rowid == Todos.id) \
+            .where(fts.op("MATCH")(fts5_query(q.split()))) \
+            .order_by(func.bm25(fts, 10.0, 1.0), Todos.id)
+    pattern = f"%{q}%"
+    return query.where(or_(
+        Todos.title.ilike(pattern), Todos.description.ilike(pattern))
+    ).order_by(Todos.id)
+
+
+async def search_todos(
+    db: AsyncSession, owner_id: int, q: str, limit: int
+) -> list:
+    if not q.split():
+        return []
+    query = search_query(db.bind.dialect.name, owner_id, q, limit)
+    return (await db.scalars(query)).all()
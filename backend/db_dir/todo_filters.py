@@ -0,0 +1,61 @@
+from typing import Optional
+
+from fastapi import Query
+
+from db_dir.db_models import Todos
+from db_dir.pagination import order_clauses
+from exceptions import invalid_filter_exception
+
+ORDER_COLUMNS = {
+    "id": (),
+    "priority": (Todos.priority,),
+}
+
+
+class TodoFilters:
+    def __init__(
+        self,
+        completed: Optional[bool] = None,
+        priority_min: Optional[int] = Query(None, ge=1, le=5),
+        priority_max: Optional[int] = Query(None, ge=1, le=5),
+        title_prefix: Optional[str] = Query(
+            None, min_length=1, max_length=100),
+        order_by: str = Query("id", regex="^-?(id|priority)$")
+    ) -> None:
+        if priority_min is not None and priority_max is not None \
+                and priority_min > priority_max:
+            raise invalid_filter_exception(
+                "priority_min must not be greater than priority_max")
+        self.completed = completed
+        self.priority_min = priority_min
+        self.priority_max = priority_max
+        self.title_prefix = title_prefix
+        self.order_by = order_by
+
+    @property
+    def descending(self) -> bool:
+        return self.order_by.startswith("-")
+
+    @property
+    def order_columns(self) -> tuple:
+        return ORDER_COLUMNS[self.order_by.lstrip("-")]
+
+    def apply(self, query):
+        if self.completed is not None:
+            query = query.where(Todos.completed.is_(self.completed))
+        if self.priority_min is not None:
+            query = query.where(Todos.priority >= self.priority_min)
+        if self.priority_max is not None:
+            query = query.where(Todos.priority <= self.priority_max)
+        if self.title_prefix is not None:
+            query = query.where(
+                Todos.title.startswith(self.title_prefix, autoescape=True))
+        return query
+
+    def ordering(self) -> list:
+        return order_clauses([*self.order_columns, Todos.id], self.descending)
+
+    def cache_key(self) -> str:
+        return ":".join(map(str, (
+            self.completed, self.priority_min, self.priority_max,
+            self.title_prefix, self.order_by)))
@@ -25,3 +25,45 @@ def token_exception():
         headers={"WWW-Authenticate": "Bearer"}
     )
     return token_exception_response
+
+
+def service_busy_exception():
+    busy_exception_response = HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, try again later",
+        headers={"Retry-After": "1"}
+    )
+    return busy_exception_response
+
+
+def invalid_cursor_exception():
+    cursor_exception_response = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+    return cursor_exception_response
+
+
+def forbidden_exception():
+    forbidden_exception_response = HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Not enough permissions"
+    )
+    return forbidden_exception_response
+
+
+def invalid_filter_exception(detail: str):
+    filter_exception_response = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=detail
+    )
+    return filter_exception_response
+
+
+def too_many_requests_exception(retry_after: int):
+    rate_limit_exception_response = HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests, try again later",
+        headers={"Retry-After": str(retry_after)}
+    )
+    return rate_limit_exception_response
@@ -1,36 +1,79 @@
-from fastapi import FastAPI, status
-from fastapi.responses import RedirectResponse
+from fastapi import Depends, FastAPI, status
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from starlette.staticfiles import StaticFiles
 
-from db_dir.db import engine
+from db_dir.db import dispose_engine, init_engine
 from db_dir.db_models import Base
+from db_dir.migrations import check_migrations
 from routers.api.address import address_router
-from routers.api.auth_api import auth_router
+from routers.api.auth_api import auth_router, get_metrics_scraper
+from routers.api.internal import internal_router
 from routers.api.todos_api import todos_router
 from routers.api.users_api import users_router
 from routers.fullstack.auth import auth_front_router
+from routers.fullstack.templating import configure_bytecode_cache
 from routers.fullstack.todos import todos_front_router
 from routers.fullstack.users import users_front_router
+from services.metrics import MetricsMiddleware, metrics
+from services.passwords import password_hasher
+from services.todo_events import todo_events
+from services.token_revocation import token_revocations
+from settings import env_flag
 
-app = FastAPI(title="Todo app")
+api_prefix = "/api/v1"
 
-Base.metadata.create_all(bind=engine)
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+async def startup():
+    configure_bytecode_cache()
+    engine = init_engine()
+    try:
+        if env_flag("DB_CREATE_TABLES", "false"):
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+        if env_flag("DB_CHECK_MIGRATIONS", "false"):
+            await check_migrations(engine)
+        await token_revocations.start()
+        await todo_events.start()
+    except BaseException:
+        await token_revocations.stop()
+        await dispose_engine()
+        raise
 
-api_prefix = "/api/v1"
+
+async def shutdown():
+    await todo_events.stop()
+    await token_revocations.stop()
+    password_hasher.shutdown()
+    await dispose_engine()
 
 
-@app.get('/', include_in_schema=False)
 async def root():
     return RedirectResponse(
         url='/todos', status_code=status.HTTP_302_FOUND)
 
 
-app.include_router(auth_router, prefix=api_prefix)
-app.include_router(users_router, prefix=api_prefix)
-app.include_router(todos_router, prefix=api_prefix)
-app.include_router(address_router, prefix=api_prefix)
-app.include_router(todos_front_router, include_in_schema=False)
-app.include_router(users_front_router, include_in_schema=False)
-app.include_router(auth_front_router, include_in_schema=False)
+def create_app() -> FastAPI:
+    app = FastAPI(title="Todo app", default_response_class=ORJSONResponse)
+    app.add_event_handler("startup", startup)
+    app.add_event_handler("shutdown", shutdown)
+    app.add_middleware(MetricsMiddleware)
+
+    app.mount("/static", StaticFiles(directory="static"), name="static")
+    app.add_api_route('/', root, include_in_schema=False)
+    app.add_api_route(
+        '/metrics', metrics, include_in_schema=False,
+        dependencies=[Depends(get_metrics_scraper)])
+
+    app.include_router(auth_router, prefix=api_prefix)
+    app.include_router(users_router, prefix=api_prefix)
+    app.include_router(todos_router, prefix=api_prefix)
+    app.include_router(address_router, prefix=api_prefix)
+    app.include_router(
+        internal_router, prefix=api_prefix, include_in_schema=False)
+    app.include_router(todos_front_router, include_in_schema=False)
+    app.include_router(users_front_router, include_in_schema=False)
+    app.include_router(auth_front_router, include_in_schema=False)
+    return app
+
+
+app = create_app()
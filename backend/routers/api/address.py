@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from db_dir.db import get_db
 from db_dir.db_models import Address, Users
@@ -18,7 +19,7 @@ address_router = APIRouter(
 async def create_address(
     address: AddressPydantic,
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if user is None:
         raise get_user_exception()
@@ -32,10 +33,10 @@ async def create_address(
     address_model.apt_num = address.apt_num
 
     db.add(address_model)
-    db.flush()
+    await db.flush()
 
-    user_model = db.query(Users).filter(Users.id == user['id']).first()
+    user_model = await db.scalar(select(Users).where(Users.id == user['id']))
     user_model.address_id = address_model.id
 
     db.add(user_model)
-    db.commit()
+    await db.commit()
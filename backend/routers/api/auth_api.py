@@ -1,28 +1,36 @@
 import os
+import secrets
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
 from fastapi import APIRouter, Depends
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db_dir.db import engine, get_db
-from db_dir.db_models import Base, Users
+from db_dir.db import get_db
+from db_dir.db_models import Users
 from db_dir.pydantic_models import CreateUser
-from exceptions import get_user_exception, token_exception
+from exceptions import forbidden_exception, get_user_exception, token_exception
+from services.passwords import password_hasher
+from services.rate_limit import RateLimit
+from services.token_cache import decode_access_token
+from services.token_revocation import TOKEN_LIFETIME, token_revocations
 
 SECRET_KEY = os.getenv("SECRET_KEY")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 ALGORITHM = "HS256"
 
 
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-Base.metadata.create_all(bind=engine)
-
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl="token")
 
+login_rate_limit = RateLimit(
+    "login", per_ip="20/minute", per_username="10/minute")
+register_rate_limit = RateLimit("register", per_ip="10/minute")
+
 
 auth_router = APIRouter(
     prefix="/auth",
@@ -31,20 +39,19 @@ auth_router = APIRouter(
 )
 
 
-def get_password_hash(password):
-    return bcrypt_context.hash(password)
+async def get_password_hash(password):
+    return await password_hasher.hash(password)
 
 
-def verify_password(plain_password, hashed_password):
-    return bcrypt_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
-def authenticate_user(username: str, password: str, db: Session):
-    user = db.query(Users)\
-        .filter(Users.username == username).first()
+async def authenticate_user(username: str, password: str, db: AsyncSession):
+    user = await db.scalar(select(Users).where(Users.username == username))
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         return False
     return user
 
@@ -52,7 +59,12 @@ def authenticate_user(username: str, password: str, db: Session):
 def create_access_token(
     username: str, user_id: str, expires_delta: Optional[timedelta] = None
 ):
-    encode = {'sub': username, 'id': user_id}
+    encode = {
+        'sub': username,
+        'id': user_id,
+        'jti': uuid.uuid4().hex,
+        'iat': time.time()
+    }
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -63,40 +75,95 @@ def create_access_token(
 
 async def get_current_user(token: str = Depends(oauth2_bearer)):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token, SECRET_KEY, ALGORITHM)
         username: str = payload.get('sub')
         user_id: int = payload.get('id')
         if username is None or user_id is None:
             raise get_user_exception()
+        if token_revocations.is_revoked(payload):
+            raise get_user_exception()
         return {"username": username, "id": user_id}
     except JWTError:
         raise get_user_exception()
 
 
-@auth_router.post('/create_user')
-async def create_user(user: CreateUser, db: Session = Depends(get_db)):
+async def get_admin_user(
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    is_admin = await db.scalar(
+        select(Users.is_admin).where(Users.id == user['id']))
+    if not is_admin:
+        raise forbidden_exception()
+    return user
+
+
+async def get_metrics_scraper(
+    token: str = Depends(oauth2_bearer),
+    db: AsyncSession = Depends(get_db)
+):
+    if METRICS_TOKEN and secrets.compare_digest(
+            token.encode(), METRICS_TOKEN.encode()):
+        return None
+    return await get_admin_user(await get_current_user(token), db)
+
+
+@auth_router.post(
+    '/create_user', dependencies=[Depends(register_rate_limit)])
+async def create_user(user: CreateUser, db: AsyncSession = Depends(get_db)):
     create_user_model = Users()
     create_user_model.username = user.username
     create_user_model.email = user.email
     create_user_model.first_name = user.first_name
     create_user_model.last_name = user.last_name
-    create_user_model.hashed_password = get_password_hash(user.password)
+    create_user_model.hashed_password = await get_password_hash(user.password)
     create_user_model.is_active = True
     create_user_model.phone_number = user.phone_number
 
     db.add(create_user_model)
-    db.commit()
+    await db.commit()
 
 
-@auth_router.post('/token')
+@auth_router.post('/token', dependencies=[Depends(login_rate_limit)])
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = authenticate_user(form_data.username, form_data.password, db)
+    user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
         raise token_exception()
-    token_expires = timedelta(minutes=200)
     token = create_access_token(
-        user.username, user.id, expires_delta=token_expires)
+        user.username, user.id, expires_delta=TOKEN_LIFETIME)
     return {"Your token": token}
+
+
+@auth_router.post('/logout')
+async def logout(
+    token: str = Depends(oauth2_bearer),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        payload = decode_access_token(token, SECRET_KEY, ALGORITHM)
+    except JWTError:
+        raise get_user_exception()
+    if payload.get('id') is None or token_revocations.is_revoked(payload):
+        raise get_user_exception()
+    await token_revocations.revoke_token(db, payload)
+    await db.commit()
+    return {
+        "status": 200,
+        "message": "Token revoked"
+    }
+
+
+@auth_router.post('/logout_all')
+async def logout_all(
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    await token_revocations.revoke_user_tokens(db, user['id'])
+    await db.commit()
+    return {
+        "status": 200,
+        "message": "All tokens revoked"
+    }
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends
+
+from db_dir.db import get_pool_status
+from services.passwords import password_hasher
+from services.rate_limit import rate_limiter
+from services.todo_cache import todo_list_cache
+from services.todo_events import todo_events
+from services.token_cache import token_cache
+from services.token_revocation import token_revocations
+
+from ..api.auth_api import get_admin_user
+from ..fullstack.templating import fragment_cache
+
+internal_router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(get_admin_user)]
+)
+
+
+@internal_router.get("/password-hasher")
+async def password_hasher_stats():
+    return password_hasher.stats()
+
+
+@internal_router.get("/db-pool")
+async def db_pool_status():
+    return get_pool_status()
+
+
+@internal_router.get("/token-cache")
+async def token_cache_stats():
+    return token_cache.stats()
+
+
+@internal_router.get("/todo-cache")
+async def todo_cache_stats():
+    return todo_list_cache.stats()
+
+
+@internal_router.get("/fragment-cache")
+async def fragment_cache_stats():
+    return fragment_cache.stats()
+
+
+@internal_router.get("/rate-limit")
+async def rate_limit_stats():
+    return rate_limiter.stats()
+
+
+@internal_router.get("/token-revocations")
+async def token_revocation_stats():
+    return token_revocations.stats()
+
+
+@internal_router.get("/todo-events")
+async def todo_events_stats():
+    return todo_events.stats()
@@ -1,10 +1,26 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-
-from db_dir.db import engine, get_db
-from db_dir.db_models import Base, Todos
-from db_dir.pydantic_models import Todo
-from exceptions import raise_item_not_found
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_dir.db import get_db
+from db_dir.db_models import Todos, Users
+from db_dir.pagination import MAX_PAGE_SIZE, PageParams, paginate
+from db_dir.pydantic_models import (Todo, TodoBatch, TodoPage, TodoResponse,
+                                    TodoSearchResults, TodoStatsResponse)
+from db_dir.search import search_todos
+from db_dir.todo_filters import TodoFilters
+from exceptions import forbidden_exception, raise_item_not_found
+from services.etag import etag_matches, make_etag, not_modified_response
+from services.export import EXPORTERS, MEDIA_TYPES, export_query
+from services.serialization import page_response, page_to_dict, to_dict
+from services.todo_batch import apply_todo_batch
+from services.todo_cache import todo_list_cache
+from services.todo_events import event_data, todo_events
+from services.todo_mutations import delete_owned_todo, update_owned_todo
+from services.todo_stats import get_todo_stats, record_todo_changes, todo_key
 
 from ..api.auth_api import get_current_user, get_user_exception
 
@@ -14,44 +30,136 @@ todos_router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
-Base.metadata.create_all(bind=engine)
+BATCH_EVENTS = {
+    "create": "created",
+    "update": "updated",
+    "delete": "deleted",
+}
 
 
-@todos_router.get("/")
-async def read_all(db: Session = Depends(get_db)):
-    return db.query(Todos).all()
+@todos_router.get("/", response_model=TodoPage)
+async def read_all(
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    return page_response(
+        TodoResponse, await paginate(db, select(Todos), Todos, page))
 
 
-@todos_router.get("/{todo_id}")
-async def read_todo(
-    todo_id: int,
+@todos_router.get("/user", response_model=TodoPage)
+async def read_all_by_user(
+    request: Request,
+    page: PageParams = Depends(),
+    filters: TodoFilters = Depends(),
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if user is None:
         raise get_user_exception()
-    todo = db.query(Todos).filter(Todos.id == todo_id)\
-        .filter(Todos.owner_id == user['id']).first()
-    if todo is not None:
-        return todo
-    raise raise_item_not_found()
+    version = await todo_list_cache.get_version(db, user['id'])
+    view = f"page:{page.limit}:{page.cursor}:{filters.cache_key()}"
+    etag = make_etag("todos", user['id'], version, view)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+
+    async def load_page():
+        query = filters.apply(
+            select(Todos).where(Todos.owner_id == user['id']))
+        return page_to_dict(TodoResponse, await paginate(
+            db, query, Todos, page,
+            filters.order_columns, filters.descending))
+
+    todos_page = await todo_list_cache.get_or_load(
+        db, user['id'], view, load_page, version)
+    return ORJSONResponse(todos_page, headers={"ETag": etag})
+
+
+@todos_router.get("/search", response_model=TodoSearchResults)
+async def search_user_todos(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(20, gt=0, le=MAX_PAGE_SIZE),
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if user is None:
+        raise get_user_exception()
+    todos = await search_todos(db, user['id'], q, limit)
+    return ORJSONResponse(
+        {"items": [to_dict(TodoResponse, todo) for todo in todos]})
 
 
-@todos_router.get("/user")
-async def read_all_by_user(
+@todos_router.get("/stats", response_model=TodoStatsResponse)
+async def read_todo_stats(
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if user is None:
         raise get_user_exception()
-    return db.query(Todos).filter(Todos.owner_id == user['id']).all()
+    return await get_todo_stats(db, user['id'])
+
+
+@todos_router.get("/events")
+async def stream_todo_events(
+    last_event_id: Optional[str] = Header(None),
+    user: dict = Depends(get_current_user)
+):
+    if user is None:
+        raise get_user_exception()
+    return StreamingResponse(
+        todo_events.stream(user['id'], last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@todos_router.get("/export")
+async def export_todos(
+    export_format: str = Query(
+        "ndjson", alias="format", regex="^(ndjson|csv)$"),
+    all_users: bool = False,
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if user is None:
+        raise get_user_exception()
+    owner_id = user['id']
+    if all_users:
+        is_admin = await db.scalar(
+            select(Users.is_admin).where(Users.id == user['id']))
+        if not is_admin:
+            raise forbidden_exception()
+        owner_id = None
+    return StreamingResponse(
+        EXPORTERS[export_format](db, export_query(owner_id)),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition":
+                f"attachment; filename=todos.{export_format}"
+        }
+    )
+
+
+@todos_router.get("/{todo_id}", response_model=TodoResponse)
+async def read_todo(
+    todo_id: int,
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if user is None:
+        raise get_user_exception()
+    todo = await db.scalar(
+        select(Todos).where(Todos.id == todo_id)
+        .where(Todos.owner_id == user['id']))
+    if todo is not None:
+        return todo
+    raise raise_item_not_found()
 
 
 @todos_router.post("/")
 async def create_todo(
     todo: Todo,
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if user is None:
         raise get_user_exception()
@@ -63,7 +171,11 @@ async def create_todo(
     todo_model.owner_id = user['id']
 
     db.add(todo_model)
-    db.commit()
+    await record_todo_changes(db, user['id'], added=[todo_key(todo_model)])
+    await todo_list_cache.invalidate(db, user['id'])
+    await db.commit()
+    await todo_events.publish(
+        user['id'], "created", todo_model.id, event_data(todo_model))
 
     return {
         "status": 201,
@@ -71,26 +183,45 @@ async def create_todo(
     }
 
 
+@todos_router.post("/batch")
+async def batch_todos(
+    batch: TodoBatch,
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if user is None:
+        raise get_user_exception()
+    results = await apply_todo_batch(db, user['id'], batch.operations)
+    for operation, result in zip(batch.operations, results):
+        if result["status"] == 404:
+            continue
+        data = operation.todo and event_data(operation.todo)
+        await todo_events.publish(
+            user['id'], BATCH_EVENTS[operation.op], result["id"], data)
+    return {
+        "status": 200,
+        "results": results
+    }
+
+
 @todos_router.put("/{todo_id}")
 async def update_todo(
     todo_id: int,
     todo: Todo,
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if user is None:
         raise get_user_exception()
-    todo_model = db.query(Todos)\
-        .filter(Todos.owner_id == user['id'])\
-        .filter(Todos.id == todo_id).first()
-
-    if todo_model is not None:
-        todo_model.title = todo.title
-        todo_model.description = todo.description
-        todo_model.priority = todo.priority
-        todo_model.completed = todo.completed
+    old = await update_owned_todo(db, user['id'], todo_id, todo.dict())
 
-        db.commit()
+    if old is not None:
+        await record_todo_changes(
+            db, user['id'], added=[todo_key(todo)], removed=[old])
+        await todo_list_cache.invalidate(db, user['id'])
+        await db.commit()
+        await todo_events.publish(
+            user['id'], "updated", todo_id, event_data(todo))
 
         return {
             "status": 200,
@@ -103,18 +234,18 @@ async def update_todo(
 async def delete_todo(
     todo_id: int,
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if user is None:
         raise get_user_exception()
 
-    todo_model = db.query(Todos)\
-        .filter(Todos.id == todo_id)\
-        .filter(Todos.owner_id == user['id']).first()
+    old = await delete_owned_todo(db, user['id'], todo_id)
 
-    if todo_model is not None:
-        db.query(Todos).filter(Todos.id == todo_id).delete()
-        db.commit()
+    if old is not None:
+        await record_todo_changes(db, user['id'], removed=[old])
+        await todo_list_cache.invalidate(db, user['id'])
+        await db.commit()
+        await todo_events.publish(user['id'], "deleted", todo_id)
         return {
             "status": 201,
             'message': 'Todo deleted successfully'
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-
-from db_dir.db import engine, get_db
-from db_dir.db_models import Base, Users
-from db_dir.pydantic_models import UserVerification
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import delete, select
+from sqlalchemy.orm import joinedload, raiseload
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_dir.db import get_db
+from db_dir.db_models import Todos, Users
+from db_dir.pagination import PageParams, paginate
+from db_dir.pydantic_models import (AddressResponse, TodoResponse, UserPage,
+                                    UserProfileResponse, UserResponse,
+                                    UserVerification)
 from exceptions import get_user_exception, raise_item_not_found
+from services.etag import etag_matches, make_etag, not_modified_response
+from services.serialization import page_response, page_to_dict, to_dict
 
 from ..api.auth_api import get_current_user, get_password_hash, verify_password
 
@@ -14,45 +22,75 @@ users_router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
-Base.metadata.create_all(bind=engine)
-
 
-@users_router.get("/")
-async def get_all_users(db: Session = Depends(get_db)):
-    return db.query(Users).all()
+@users_router.get("/", response_model=UserPage)
+async def get_all_users(
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    return page_response(
+        UserResponse, await paginate(db, select(Users), Users, page))
 
 
-@users_router.get("/user/{user_id}")
+@users_router.get("/me/profile", response_model=UserProfileResponse)
+async def get_my_profile(
+    page: PageParams = Depends(),
+    user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if user is None:
+        raise get_user_exception()
+    user_model = await db.scalar(
+        select(Users).where(Users.id == user['id'])
+        .options(joinedload(Users.address), raiseload("*")))
+    if user_model is None:
+        raise raise_item_not_found()
+    todos_page = await paginate(
+        db, select(Todos).where(Todos.owner_id == user['id']), Todos, page)
+    address = user_model.address
+    return ORJSONResponse({
+        "user": to_dict(UserResponse, user_model),
+        "address": address and to_dict(AddressResponse, address),
+        "todos": page_to_dict(TodoResponse, todos_page)
+    })
+
+
+@users_router.get("/user/{user_id}", response_model=UserResponse)
 async def get_user_by_path(
     user_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
-    user_model = db.query(Users).filter(Users.id == user_id).first()
-    if user_model is not None:
-        return user_model
-    raise raise_item_not_found()
+    user_model = await db.scalar(select(Users).where(Users.id == user_id))
+    if user_model is None:
+        raise raise_item_not_found()
+    user_data = to_dict(UserResponse, user_model)
+    etag = make_etag("users", *user_data.values())
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    return ORJSONResponse(user_data, headers={"ETag": etag})
 
 
 @users_router.put("/user/password")
 async def user_password_change(
     user_verification: UserVerification,
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if user is None:
         raise get_user_exception()
 
-    user_model = db.query(Users).filter(Users.id == user['id']).first()
+    user_model = await db.scalar(select(Users).where(Users.id == user['id']))
 
     if user_model is not None:
         if user_verification.username == user_model.username and \
-            verify_password(
+            await verify_password(
                 user_verification.password, user_model.hashed_password):
-            user_model.hashed_password = get_password_hash(
+            user_model.hashed_password = await get_password_hash(
                 user_verification.new_password
             )
             db.add(user_model)
-            db.commit()
+            await db.commit()
             return "seccussful"
     return "Invalid user or request"
 
@@ -60,16 +98,16 @@ async def user_password_change(
 @users_router.delete("/user/delete_account")
 async def delete_user(
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     if user is None:
         raise get_user_exception()
 
-    user_model = db.query(Users).filter(Users.id == user['id']).first()
+    user_model = await db.scalar(select(Users).where(Users.id == user['id']))
 
     if user_model is not None:
-        db.query(Users).filter(Users.id == user['id']).delete()
-        db.commit()
+        await db.execute(delete(Users).where(Users.id == user['id']))
+        await db.commit()
         return {
             "status": 201,
             "message": "Your profile deleted successfully"
@@ -1,4 +1,6 @@
 import os
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -6,26 +8,32 @@ from fastapi import (APIRouter, Depends, Form, HTTPException, Request,
                      Response, status)
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.templating import Jinja2Templates
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db_dir.db import engine, get_db
-from db_dir.db_models import Base, Users
+from db_dir.db import get_db
+from db_dir.db_models import Users
+from services.passwords import password_hasher
+from services.rate_limit import RateLimit
+from services.token_cache import decode_access_token
+from services.token_revocation import TOKEN_LIFETIME, token_revocations
+
+from .templating import templates
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 
 
-templates = Jinja2Templates(directory="templates")
-
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-Base.metadata.create_all(bind=engine)
-
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl="token")
 
+login_form_rate_limit = RateLimit(
+    "login", per_ip="20/minute", per_username="10/minute",
+    username_field="email")
+login_rate_limit = RateLimit(
+    "login", per_ip="20/minute", per_username="10/minute")
+register_rate_limit = RateLimit("register", per_ip="10/minute")
+
 
 auth_front_router = APIRouter(
     prefix="/auth",
@@ -46,20 +54,19 @@ class LoginForm:
         self.password = form["password"]
 
 
-def get_password_hash(password):
-    return bcrypt_context.hash(password)
+async def get_password_hash(password):
+    return await password_hasher.hash(password)
 
 
-def verify_password(plain_password, hashed_password):
-    return bcrypt_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
-def authenticate_user(username: str, password: str, db: Session):
-    user = db.query(Users)\
-        .filter(Users.username == username).first()
+async def authenticate_user(username: str, password: str, db: AsyncSession):
+    user = await db.scalar(select(Users).where(Users.username == username))
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         return False
     return user
 
@@ -67,7 +74,12 @@ def authenticate_user(username: str, password: str, db: Session):
 def create_access_token(
     username: str, user_id: str, expires_delta: Optional[timedelta] = None
 ):
-    encode = {'sub': username, 'id': user_id}
+    encode = {
+        'sub': username,
+        'id': user_id,
+        'jti': uuid.uuid4().hex,
+        'iat': time.time()
+    }
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -81,11 +93,13 @@ async def get_current_user(request: Request):
         token = request.cookies.get("access_token")
         if token is None:
             return None
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token, SECRET_KEY, ALGORITHM)
         username: str = payload.get('sub')
         user_id: int = payload.get('id')
         if username is None or user_id is None:
             logout(request)
+        if token_revocations.is_revoked(payload):
+            return None
         return {"username": username, "id": user_id}
     except JWTError:
         raise HTTPException(status_code=404, detail="Not Found")
@@ -96,8 +110,10 @@ async def auth_page(request: Request):
     return templates.TemplateResponse("login.html", {"request": request})
 
 
-@auth_front_router.post('/', response_class=HTMLResponse)
-async def login(request: Request, db: Session = Depends(get_db)):
+@auth_front_router.post(
+    '/', response_class=HTMLResponse,
+    dependencies=[Depends(login_form_rate_limit)])
+async def login(request: Request, db: AsyncSession = Depends(get_db)):
     try:
         form = LoginForm(request)
         await form.create_auth_form()
@@ -121,7 +137,16 @@ async def login(request: Request, db: Session = Depends(get_db)):
 
 
 @auth_front_router.get('/logout')
-async def logout(request: Request):
+async def logout(request: Request, db: AsyncSession = Depends(get_db)):
+    token = request.cookies.get("access_token")
+    if token is not None:
+        try:
+            payload = decode_access_token(token, SECRET_KEY, ALGORITHM)
+        except JWTError:
+            payload = None
+        if payload is not None and payload.get('id') is not None:
+            await token_revocations.revoke_token(db, payload)
+            await db.commit()
     msg = "Logout Successful"
     response = templates.TemplateResponse(
         "login.html", {"request": request, "msg": msg})
@@ -134,7 +159,9 @@ async def register_page(request: Request):
     return templates.TemplateResponse("register.html", {"request": request})
 
 
-@auth_front_router.post('/register', response_class=HTMLResponse)
+@auth_front_router.post(
+    '/register', response_class=HTMLResponse,
+    dependencies=[Depends(register_rate_limit)])
 async def register_user(
     request: Request,
     email: str = Form(),
@@ -143,10 +170,11 @@ async def register_user(
     last_name: str = Form(),
     password: str = Form(),
     password2: str = Form(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    validation1 = db.query(Users).filter(Users.username == username).first()
-    validation2 = db.query(Users).filter(Users.email == email).first()
+    validation1 = await db.scalar(
+        select(Users).where(Users.username == username))
+    validation2 = await db.scalar(select(Users).where(Users.email == email))
 
     if password != password2:
         msg = "Passwords do not match"
@@ -166,30 +194,29 @@ async def register_user(
     user_model.email = email
     user_model.first_name = first_name
     user_model.last_name = last_name
-    hash_password = get_password_hash(password)
+    hash_password = await get_password_hash(password)
     user_model.hashed_password = hash_password
     user_model.is_active = True
 
     db.add(user_model)
-    db.commit()
+    await db.commit()
 
     msg = "Account successfully created"
     return templates.TemplateResponse(
         "login.html", {"request": request, "msg": msg})
 
 
-@auth_front_router.post('/token')
+@auth_front_router.post('/token', dependencies=[Depends(login_rate_limit)])
 async def login_for_access_token(
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = authenticate_user(form_data.username, form_data.password, db)
+    user = await authenticate_user(form_data.username, form_data.password, db)
     if not user:
         return False
-    token_expires = timedelta(minutes=200)
     token = create_access_token(
-        user.username, user.id, expires_delta=token_expires)
+        user.username, user.id, expires_delta=TOKEN_LIFETIME)
 
     response.set_cookie(key="access_token", value=token, httponly=True)
 
@@ -0,0 +1,59 @@
+import os
+from collections import OrderedDict
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+templates = Jinja2Templates(directory="templates")
+
+
+def configure_bytecode_cache() -> None:
+    directory = os.getenv("TEMPLATE_CACHE_DIR")
+    if directory:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    templates.env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+class FragmentCache:
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._fragments = OrderedDict()
+
+    def render(self, template_name: str, key: tuple, **context) -> Markup:
+        cache_key = (template_name,) + key
+        fragment = self._fragments.get(cache_key)
+        if fragment is not None:
+            self._fragments.move_to_end(cache_key)
+            self.hits += 1
+            return fragment
+        self.misses += 1
+        fragment = Markup(
+            templates.get_template(template_name).render(**context))
+        self._fragments[cache_key] = fragment
+        while len(self._fragments) > self.max_size:
+            self._fragments.popitem(last=False)
+        return fragment
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._fragments),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+fragment_cache = FragmentCache(
+    max_size=int(os.getenv("FRAGMENT_CACHE_SIZE", "10000")))
+
+
+def todo_row(todo) -> Markup:
+    row_version = (todo["title"], todo["completed"])
+    return fragment_cache.render(
+        "todo-row.html", (todo["id"],) + row_version, todo=todo)
+
+
+templates.env.globals["todo_row"] = todo_row
@@ -1,12 +1,19 @@
 from fastapi import APIRouter, Depends, Form, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-
-from db_dir.db import engine, get_db
-from db_dir.db_models import Base, Todos
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_dir.db import get_db
+from db_dir.db_models import Todos
+from db_dir.todo_filters import TodoFilters
+from services.todo_cache import todo_list_cache, todo_to_dict
+from services.todo_events import event_data, todo_events
+from services.todo_mutations import (delete_owned_todo, toggle_owned_todo,
+                                     update_owned_todo)
+from services.todo_stats import record_todo_changes, todo_key
 
 from .auth import get_current_user
+from .templating import templates
 
 todos_front_router = APIRouter(
     prefix="/todos",
@@ -14,18 +21,26 @@ todos_front_router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
-Base.metadata.create_all(bind=engine)
-
-templates = Jinja2Templates(directory="templates")
-
 
 @todos_front_router.get("/", response_class=HTMLResponse)
-async def read_all(request: Request, db: Session = Depends(get_db)):
+async def read_all(
+    request: Request,
+    filters: TodoFilters = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
     user = await get_current_user(request)
     if user is None:
         return RedirectResponse(
             url="/auth", status_code=status.HTTP_302_FOUND)
-    todos = db.query(Todos).filter(Todos.owner_id == user['id']).all()
+
+    async def load_todos():
+        query = filters.apply(
+            select(Todos).where(Todos.owner_id == user['id']))
+        todos = await db.scalars(query.order_by(*filters.ordering()))
+        return [todo_to_dict(todo) for todo in todos]
+
+    todos = await todo_list_cache.get_or_load(
+        db, user['id'], f"all:{filters.cache_key()}", load_todos)
     return templates.TemplateResponse(
         "home.html", {"request": request, "todos": todos, "user": user})
 
@@ -46,7 +61,7 @@ async def create_todo(
     title: str = Form(),
     description: str = Form(),
     priority: int = Form(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     user = await get_current_user(request)
     if user is None:
@@ -61,14 +76,18 @@ async def create_todo(
     todo_.owner_id = user['id']
 
     db.add(todo_)
-    db.commit()
+    await record_todo_changes(db, user['id'], added=[todo_key(todo_)])
+    await todo_list_cache.invalidate(db, user['id'])
+    await db.commit()
+    await todo_events.publish(
+        user['id'], "created", todo_.id, event_data(todo_))
 
     return RedirectResponse(url="/todos", status_code=status.HTTP_302_FOUND)
 
 
 @todos_front_router.get("/edit-todo/{todo_id}", response_class=HTMLResponse)
 async def edit_todo(
-    request: Request, todo_id: int, db: Session = Depends(get_db)
+    request: Request, todo_id: int, db: AsyncSession = Depends(get_db)
 ):
 
     user = await get_current_user(request)
@@ -76,7 +95,7 @@ async def edit_todo(
         return RedirectResponse(
             url="/auth", status_code=status.HTTP_302_FOUND)
 
-    todo = db.query(Todos).filter(Todos.id == todo_id).first()
+    todo = await db.scalar(select(Todos).where(Todos.id == todo_id))
     return templates.TemplateResponse(
         "edit-todo.html", {"request": request, "todo": todo, "user": user})
 
@@ -88,7 +107,7 @@ async def update_todo(
     title: str = Form(),
     description: str = Form(),
     priority: int = Form(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
 
     user = await get_current_user(request)
@@ -96,21 +115,28 @@ async def update_todo(
         return RedirectResponse(
             url="/auth", status_code=status.HTTP_302_FOUND)
 
-    todo_ = db.query(Todos).filter(Todos.id == todo_id).first()
-
-    todo_.title = title
-    todo_.description = description
-    todo_.priority = priority
-
-    db.add(todo_)
-    db.commit()
+    old = await update_owned_todo(db, user['id'], todo_id, {
+        "title": title,
+        "description": description,
+        "priority": priority
+    })
+
+    if old is not None:
+        await record_todo_changes(
+            db, user['id'], added=[(priority, old.completed)], removed=[old])
+        await todo_list_cache.invalidate(db, user['id'])
+        await db.commit()
+        await todo_events.publish(user['id'], "updated", todo_id, {
+            "priority": priority,
+            "completed": old.completed
+        })
 
     return RedirectResponse(url="/todos", status_code=status.HTTP_302_FOUND)
 
 
 @todos_front_router.get("/delete-todo/{todo_id}", response_class=HTMLResponse)
 async def delete_todo(
-    request: Request, todo_id: int, db: Session = Depends(get_db)
+    request: Request, todo_id: int, db: AsyncSession = Depends(get_db)
 ):
 
     user = await get_current_user(request)
@@ -118,15 +144,13 @@ async def delete_todo(
         return RedirectResponse(
             url="/auth", status_code=status.HTTP_302_FOUND)
 
-    todo_model = db.query(Todos).filter(Todos.id == todo_id)\
-        .filter(Todos.owner_id == user['id']).first()
+    old = await delete_owned_todo(db, user['id'], todo_id)
 
-    if todo_model is None:
-        return RedirectResponse(
-            url="/todos", status_code=status.HTTP_302_FOUND)
-
-    db.query(Todos).filter(Todos.id == todo_id).delete()
-    db.commit()
+    if old is not None:
+        await record_todo_changes(db, user['id'], removed=[old])
+        await todo_list_cache.invalidate(db, user['id'])
+        await db.commit()
+        await todo_events.publish(user['id'], "deleted", todo_id)
 
     return RedirectResponse(url="/todos", status_code=status.HTTP_302_FOUND)
 
@@ -135,7 +159,7 @@ async def delete_todo(
 async def complete_todo(
     request: Request,
     todo_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
 
     user = await get_current_user(request)
@@ -143,11 +167,15 @@ async def complete_todo(
         return RedirectResponse(
             url="/auth", status_code=status.HTTP_302_FOUND)
 
-    todo_ = db.query(Todos).filter(Todos.id == todo_id).first()
+    new = await toggle_owned_todo(db, user['id'], todo_id)
 
-    todo_.completed = not todo_.completed
-
-    db.add(todo_)
-    db.commit()
+    if new is not None:
+        await record_todo_changes(
+            db, user['id'], added=[new],
+            removed=[(new.priority, not new.completed)])
+        await todo_list_cache.invalidate(db, user['id'])
+        await db.commit()
+        await todo_events.publish(
+            user['id'], "completed", todo_id, {"completed": new.completed})
 
     return RedirectResponse(url="/todos", status_code=status.HTTP_302_FOUND)
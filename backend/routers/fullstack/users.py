@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, Form, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db_dir.db import engine, get_db
-from db_dir.db_models import Base, Users
+from db_dir.db import get_db
+from db_dir.db_models import Users
 
 from .auth import get_current_user, get_password_hash, verify_password
+from .templating import templates
 
 users_front_router = APIRouter(
     prefix="/users",
@@ -14,10 +15,6 @@ users_front_router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
-Base.metadata.create_all(bind=engine)
-
-templates = Jinja2Templates(directory="templates")
-
 
 @users_front_router.get("/edit-password", response_class=HTMLResponse)
 async def edit_password_form(request: Request):
@@ -36,7 +33,7 @@ async def edit_password(
     username: str = Form(),
     password: str = Form(),
     password2: str = Form(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     user = await get_current_user(request)
     if user is None:
@@ -51,14 +48,15 @@ async def edit_password(
 
     msg = "Wrong username or password"
 
-    user_data = db.query(Users).filter(Users.username == username).first()
+    user_data = await db.scalar(
+        select(Users).where(Users.username == username))
     if user_data is not None:
-        if username == user_data.username and verify_password(
+        if username == user_data.username and await verify_password(
             password, user_data.hashed_password
         ):
-            user_data.hashed_password = get_password_hash(password2)
+            user_data.hashed_password = await get_password_hash(password2)
             db.add(user_data)
-            db.commit()
+            await db.commit()
             msg = "Password updated successfully!"
 
     return templates.TemplateResponse(
@@ -0,0 +1,26 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(":".join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (value.strip() for value in header.split(","))
+    return etag in (
+        value[2:] if value.startswith("W/") else value
+        for value in candidates
+    )
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
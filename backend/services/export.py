@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_dir.db_models import Todos
+
+EXPORT_COLUMNS = (
+    Todos.id,
+    Todos.title,
+    Todos.description,
+    Todos.priority,
+    Todos.completed,
+    Todos.owner_id,
+)
+EXPORT_BATCH_SIZE = 500
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def export_query(owner_id=None):
+    query = select(*EXPORT_COLUMNS).order_by(Todos.id)
+    if owner_id is not None:
+        query = query.where(Todos.owner_id == owner_id)
+    return query.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+async def stream_ndjson(db: AsyncSession, query):
+    result = await db.stream(query)
+    async for rows in result.partitions():
+        yield "".join(
+            json.dumps(dict(row._mapping)) + "\n" for row in rows)
+
+
+async def stream_csv(db: AsyncSession, query):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(column.key for column in EXPORT_COLUMNS)
+    result = await db.stream(query)
+    async for rows in result.partitions():
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+EXPORTERS = {
+    "ndjson": stream_ndjson,
+    "csv": stream_csv,
+}
@@ -0,0 +1,115 @@
+import time
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge,
+                               Histogram, generate_latest)
+from prometheus_client.core import GaugeMetricFamily
+from starlette.responses import Response
+
+from db_dir.db import get_pool_status
+from db_dir.instrumentation import (QueryStats, check_query_budget,
+                                    current_query_stats)
+from services.passwords import password_hasher
+from services.rate_limit import rate_limiter
+from services.todo_cache import todo_list_cache
+from services.todo_events import todo_events
+from services.token_cache import token_cache
+from services.token_revocation import token_revocations
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per HTTP request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, float("inf")),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per HTTP request",
+    ["method", "route"],
+)
+
+
+def get_route_template(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope.get("root_path"):
+        return scope["root_path"] + "/{path}"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status_code = 500
+        query_stats = QueryStats(current_query_stats.get())
+        token = current_query_stats.set(query_stats)
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.labels(method).inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_PROGRESS.labels(method).dec()
+            current_query_stats.reset(token)
+            route = get_route_template(scope)
+            REQUESTS.labels(method, route, status_code).inc()
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            REQUEST_DB_QUERIES.labels(method, route).observe(
+                query_stats.count)
+            REQUEST_DB_SECONDS.labels(method, route).observe(
+                query_stats.seconds)
+            check_query_budget(f"{method} {route}", query_stats)
+
+
+class ServiceStatsCollector:
+    sources = {
+        "todo_db_pool": get_pool_status,
+        "todo_password_hasher": password_hasher.stats,
+        "todo_token_cache": token_cache.stats,
+        "todo_list_cache": todo_list_cache.stats,
+        "todo_events": todo_events.stats,
+        "todo_rate_limiter": rate_limiter.stats,
+        "todo_token_revocations": token_revocations.stats,
+    }
+
+    def collect(self):
+        for prefix, source in self.sources.items():
+            for key, value in source().items():
+                if isinstance(value, (int, float)):
+                    yield GaugeMetricFamily(
+                        f"{prefix}_{key}", f"{prefix} {key}", value=value)
+
+
+REGISTRY.register(ServiceStatsCollector())
+
+
+async def metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
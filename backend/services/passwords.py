@@ -0,0 +1,86 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+from exceptions import service_busy_exception
+
+bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def hash_password(password: str) -> str:
+    return bcrypt_context.hash(password)
+
+
+def check_password(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt_context.verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    def __init__(self, pool: str, workers: int, queue_limit: int) -> None:
+        self.pool = pool
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.pending = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.seconds = 0.0
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.pool == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self.pending >= self.queue_limit:
+            self.rejected += 1
+            raise service_busy_exception()
+        self.pending += 1
+        self.submitted += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self.seconds += time.perf_counter() - started
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(check_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "pool": self.pool,
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "pending": self.pending,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "seconds_total": round(self.seconds, 6),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    pool=os.getenv("PASSWORD_HASHER_POOL", "thread"),
+    workers=int(os.getenv("PASSWORD_HASHER_WORKERS", os.cpu_count() or 1)),
+    queue_limit=int(os.getenv("PASSWORD_HASHER_QUEUE_LIMIT", "64")),
+)
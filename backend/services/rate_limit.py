@@ -0,0 +1,180 @@
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Request
+
+from exceptions import too_many_requests_exception
+from settings import env_flag
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+REDIS_TOKEN_BUCKETS = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local tokens = {}
+local wait = 0
+for index, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[index * 2 - 1])
+    local capacity = tonumber(ARGV[index * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'updated')
+    local available = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    available = math.min(
+        capacity, available + math.max(0, now - updated) * rate)
+    if available < 1 then
+        wait = math.max(wait, (1 - available) / rate)
+    end
+    tokens[index] = available
+end
+for index, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[index * 2 - 1])
+    local capacity = tonumber(ARGV[index * 2])
+    local available = tokens[index]
+    if wait == 0 then
+        available = available - 1
+    end
+    redis.call(
+        'HSET', key, 'tokens', tostring(available), 'updated', tostring(now))
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+return tostring(wait)
+"""
+
+
+def parse_rate(value: str) -> tuple:
+    count, _, period = value.partition("/")
+    capacity = int(count)
+    return capacity / PERIODS[period.strip()], capacity
+
+
+class MemoryRateLimitBackend:
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    async def take(self, buckets: list) -> float:
+        now = time.monotonic()
+        tokens = {}
+        wait = 0.0
+        for key, (rate, capacity) in buckets:
+            available, updated = self._buckets.get(key, (capacity, now))
+            available = min(capacity, available + (now - updated) * rate)
+            if available < 1:
+                wait = max(wait, (1 - available) / rate)
+            tokens[key] = available
+        for key, available in tokens.items():
+            self._buckets[key] = (available if wait else available - 1, now)
+            self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def size(self) -> int:
+        return len(self._buckets)
+
+
+class RedisRateLimitBackend:
+    def __init__(self, url: str) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError(
+                "RATE_LIMIT_URL points to Redis, install the redis package")
+        self.client = redis.from_url(url)
+        self.script = self.client.register_script(REDIS_TOKEN_BUCKETS)
+
+    async def take(self, buckets: list) -> float:
+        return float(await self.script(
+            keys=[f"ratelimit:{key}" for key, _ in buckets],
+            args=[value for _, limit in buckets for value in limit]))
+
+    def size(self):
+        return None
+
+
+class RateLimiter:
+    def __init__(self, backend, enabled: bool) -> None:
+        self.backend = backend
+        self.enabled = enabled
+        self.allowed = 0
+        self.limited = 0
+
+    async def take(self, buckets: list) -> float:
+        wait = await self.backend.take(buckets)
+        if wait:
+            self.limited += 1
+        else:
+            self.allowed += 1
+        return wait
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "size": self.backend.size(),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+def get_rate_limit_backend():
+    url = os.getenv("RATE_LIMIT_URL")
+    if url:
+        return RedisRateLimitBackend(url)
+    return MemoryRateLimitBackend(
+        max_keys=int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000")))
+
+
+rate_limiter = RateLimiter(
+    backend=get_rate_limit_backend(),
+    enabled=env_flag("RATE_LIMIT_ENABLED", "true"),
+)
+
+
+def get_client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+async def get_submitted_username(request: Request, field: str):
+    if request.headers.get("content-type", "").startswith(
+            "application/json"):
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        return body.get(field) if isinstance(body, dict) else None
+    return (await request.form()).get(field)
+
+
+class RateLimit:
+    def __init__(
+        self,
+        name: str,
+        per_ip: str,
+        per_username: Optional[str] = None,
+        username_field: str = "username"
+    ) -> None:
+        prefix = f"RATE_LIMIT_{name.upper()}"
+        self.name = name
+        self.per_ip = parse_rate(os.getenv(f"{prefix}_IP", per_ip))
+        self.per_username = per_username and parse_rate(
+            os.getenv(f"{prefix}_USERNAME", per_username))
+        self.username_field = username_field
+
+    async def __call__(self, request: Request) -> None:
+        if not rate_limiter.enabled:
+            return
+        buckets = [(f"{self.name}:ip:{get_client_ip(request)}", self.per_ip)]
+        if self.per_username:
+            username = await get_submitted_username(
+                request, self.username_field)
+            if username:
+                buckets.append((
+                    f"{self.name}:username:{str(username).lower()}",
+                    self.per_username))
+        wait = await rate_limiter.take(buckets)
+        if wait:
+            raise too_many_requests_exception(math.ceil(wait))
@@ -0,0 +1,21 @@
+from typing import Optional, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def to_dict(model: Type[BaseModel], obj) -> dict:
+    return {name: getattr(obj, name) for name in model.__fields__}
+
+
+def page_to_dict(model: Type[BaseModel], page: dict) -> dict:
+    return {
+        "items": [to_dict(model, item) for item in page["items"]],
+        "next_cursor": page["next_cursor"]
+    }
+
+
+def page_response(
+    model: Type[BaseModel], page: dict, headers: Optional[dict] = None
+) -> ORJSONResponse:
+    return ORJSONResponse(page_to_dict(model, page), headers=headers)
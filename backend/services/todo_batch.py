@@ -0,0 +1,109 @@
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_dir.db_models import Todos
+from services.todo_cache import todo_list_cache
+from services.todo_stats import record_todo_changes, todo_key
+
+TODO_FIELDS = ("title", "description", "priority", "completed")
+
+
+def operation_result(index: int, operation, todo_id, status: int) -> dict:
+    return {
+        "index": index,
+        "op": operation.op,
+        "id": todo_id,
+        "status": status,
+    }
+
+
+async def find_owned_todos(
+    db: AsyncSession, owner_id: int, ids: list
+) -> dict:
+    if not ids:
+        return {}
+    owned = await db.execute(
+        select(Todos.id, Todos.priority, Todos.completed)
+        .where(Todos.owner_id == owner_id)
+        .where(Todos.id.in_(ids)))
+    return {todo_id: (priority, completed)
+            for todo_id, priority, completed in owned}
+
+
+async def bulk_create(db: AsyncSession, owner_id: int, operations: list):
+    if not operations:
+        return []
+    rows = [
+        dict(operation.todo.dict(include=set(TODO_FIELDS)), owner_id=owner_id)
+        for _, operation in operations
+    ]
+    if db.bind.dialect.name == "postgresql":
+        ids = list(await db.scalars(
+            select(func.nextval(func.pg_get_serial_sequence(
+                Todos.__tablename__, Todos.id.name)))
+            .select_from(func.generate_series(1, len(rows)))))
+        await db.execute(insert(Todos), [
+            dict(row, id=todo_id) for row, todo_id in zip(rows, ids)])
+        return ids
+    todos = [Todos(**row) for row in rows]
+    db.add_all(todos)
+    await db.flush()
+    return [todo.id for todo in todos]
+
+
+async def bulk_update(db: AsyncSession, owner_id: int, operations: list):
+    if not operations:
+        return
+    statement = update(Todos)\
+        .where(Todos.id == bindparam("todo_id"))\
+        .where(Todos.owner_id == owner_id)\
+        .values({field: bindparam(field) for field in TODO_FIELDS})
+    connection = await db.connection()
+    await connection.execute(statement, [
+        dict(operation.todo.dict(include=set(TODO_FIELDS)),
+             todo_id=operation.id)
+        for _, operation in operations
+    ])
+
+
+async def bulk_delete(db: AsyncSession, owner_id: int, operations: list):
+    if not operations:
+        return
+    connection = await db.connection()
+    await connection.execute(
+        delete(Todos).where(Todos.owner_id == owner_id)
+        .where(Todos.id.in_([operation.id for _, operation in operations])))
+
+
+async def apply_todo_batch(
+    db: AsyncSession, owner_id: int, operations: list
+) -> list:
+    owned = await find_owned_todos(db, owner_id, [
+        operation.id for operation in operations if operation.op != "create"
+    ])
+    results = [None] * len(operations)
+    grouped = {"create": [], "update": [], "delete": []}
+    for index, operation in enumerate(operations):
+        if operation.op != "create" and operation.id not in owned:
+            results[index] = operation_result(
+                index, operation, operation.id, 404)
+        else:
+            grouped[operation.op].append((index, operation))
+
+    created_ids = await bulk_create(db, owner_id, grouped["create"])
+    await bulk_update(db, owner_id, grouped["update"])
+    await bulk_delete(db, owner_id, grouped["delete"])
+    await record_todo_changes(
+        db, owner_id,
+        added=[todo_key(operation.todo)
+               for _, operation in grouped["create"] + grouped["update"]],
+        removed=[owned[operation.id]
+                 for _, operation in grouped["update"] + grouped["delete"]])
+    await todo_list_cache.invalidate(db, owner_id)
+    await db.commit()
+
+    for (index, operation), todo_id in zip(grouped["create"], created_ids):
+        results[index] = operation_result(index, operation, todo_id, 201)
+    for index, operation in grouped["update"] + grouped["delete"]:
+        results[index] = operation_result(index, operation, operation.id, 200)
+    return results
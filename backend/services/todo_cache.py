@@ -0,0 +1,127 @@
+import json
+import os
+import time
+from collections import OrderedDict
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_dir.db_models import Users
+from db_dir.pydantic_models import TodoResponse
+from services.serialization import to_dict
+from settings import env_flag
+
+
+def todo_to_dict(todo) -> dict:
+    return to_dict(TodoResponse, todo)
+
+
+class MemoryCacheBackend:
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    async def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    def __init__(self, url: str, ttl: float) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError(
+                "TODO_CACHE_URL points to Redis, install the redis package")
+        self.ttl = ttl
+        self.client = redis.from_url(url)
+
+    async def get(self, key: str):
+        raw = await self.client.get(key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value) -> None:
+        await self.client.set(key, json.dumps(value), px=int(self.ttl * 1000))
+
+    def size(self):
+        return None
+
+
+class TodoListCache:
+    def __init__(self, backend, enabled: bool) -> None:
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get_version(self, db: AsyncSession, user_id: int) -> int:
+        version = await db.scalar(
+            select(Users.todos_version).where(Users.id == user_id))
+        return version or 0
+
+    async def get_or_load(
+        self, db: AsyncSession, user_id: int, view: str, loader,
+        version=None
+    ):
+        if not self.enabled:
+            return await loader()
+        if version is None:
+            version = await self.get_version(db, user_id)
+        key = f"todo-lists:{user_id}:{version}:{view}"
+        value = await self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = await loader()
+        await self.backend.set(key, value)
+        return value
+
+    async def invalidate(self, db: AsyncSession, user_id: int) -> None:
+        self.invalidations += 1
+        await db.execute(
+            update(Users).where(Users.id == user_id)
+            .values(todos_version=Users.todos_version + 1))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "size": self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+def get_cache_backend():
+    ttl = float(os.getenv("TODO_CACHE_TTL", "30"))
+    url = os.getenv("TODO_CACHE_URL")
+    if url:
+        return RedisCacheBackend(url, ttl)
+    return MemoryCacheBackend(
+        max_size=int(os.getenv("TODO_CACHE_SIZE", "10000")), ttl=ttl)
+
+
+todo_list_cache = TodoListCache(
+    backend=get_cache_backend(),
+    enabled=env_flag("TODO_CACHE_ENABLED", "true"),
+)
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+RESET_EVENT = {"id": None, "type": "reset", "todo_id": None, "data": None}
+
+
+def format_event(event: dict) -> str:
+    lines = [] if event["id"] is None else [f"id: {event['id']}"]
+    lines.append(f"event: {event['type']}")
+    lines.append("data: " + json.dumps({
+        "todo_id": event["todo_id"], "data": event["data"]}))
+    return "\n".join(lines) + "\n\n"
+
+
+def event_data(todo) -> dict:
+    return {"priority": todo.priority, "completed": todo.completed}
+
+
+class EventHistory:
+    def __init__(self, size: int) -> None:
+        self.start = f"start-{uuid.uuid4().hex}"
+        self.events = deque(maxlen=size)
+
+    def append(self, event: dict) -> None:
+        if len(self.events) == self.events.maxlen:
+            self.start = f"start-{uuid.uuid4().hex}"
+        self.events.append(event)
+
+    def latest_id(self) -> str:
+        return self.events[-1]["id"] if self.events else self.start
+
+
+class LocalEventBackend:
+    def __init__(self) -> None:
+        self.dispatch = None
+
+    async def start(self, dispatch, reset) -> None:
+        self.dispatch = dispatch
+
+    async def publish(self, event: dict) -> None:
+        self.dispatch(event)
+
+    async def stop(self) -> None:
+        self.dispatch = None
+
+
+class PostgresEventBackend:
+    channel = "todo_events"
+
+    def __init__(self, url: str, reconnect_interval: float) -> None:
+        self.url = url.replace("+asyncpg", "")
+        self.reconnect_interval = reconnect_interval
+        self.connection = None
+        self._lock = asyncio.Lock()
+        self._task = None
+
+    async def connect(self, dispatch) -> None:
+        import asyncpg
+        self.connection = await asyncpg.connect(self.url)
+        await self.connection.add_listener(
+            self.channel,
+            lambda connection, pid, channel, payload:
+                dispatch(json.loads(payload)))
+
+    async def _listen_forever(self, dispatch, reset) -> None:
+        while True:
+            await asyncio.sleep(self.reconnect_interval)
+            if not self.connection.is_closed():
+                continue
+            logger.warning("Todo events listener lost, reconnecting")
+            try:
+                await self.connect(dispatch)
+            except Exception:
+                logger.exception("Could not reconnect the todo listener")
+            else:
+                reset()
+
+    async def start(self, dispatch, reset) -> None:
+        await self.connect(dispatch)
+        self._task = asyncio.create_task(
+            self._listen_forever(dispatch, reset))
+
+    async def publish(self, event: dict) -> None:
+        async with self._lock:
+            await self.connection.execute(
+                "SELECT pg_notify($1, $2)", self.channel, json.dumps(event))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.connection is not None:
+            await self.connection.close()
+            self.connection = None
+
+
+class TodoEventBroker:
+    def __init__(
+        self,
+        backend,
+        history_size: int,
+        history_users: int,
+        queue_size: int,
+        heartbeat: float,
+        stream_lifetime: float,
+        retry: int
+    ) -> None:
+        self.backend = backend
+        self.history_size = history_size
+        self.history_users = history_users
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.stream_lifetime = stream_lifetime
+        self.retry = retry
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+        self.publish_errors = 0
+        self._subscribers = {}
+        self._history = OrderedDict()
+
+    async def start(self) -> None:
+        await self.backend.start(self.dispatch, self.reset)
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+
+    async def publish(
+        self,
+        user_id: int,
+        event_type: str,
+        todo_id: int,
+        data: Optional[dict] = None
+    ) -> None:
+        try:
+            await self.backend.publish({
+                "id": str(time.time_ns()),
+                "user_id": user_id,
+                "type": event_type,
+                "todo_id": todo_id,
+                "data": data,
+            })
+        except Exception:
+            self.publish_errors += 1
+            logger.exception("Could not publish a %s todo event", event_type)
+        else:
+            self.published += 1
+
+    def history(self, user_id: int) -> EventHistory:
+        history = self._history.get(user_id)
+        if history is None:
+            history = self._history[user_id] = EventHistory(
+                self.history_size)
+        self._history.move_to_end(user_id)
+        while len(self._history) > self.history_users:
+            self._history.popitem(last=False)
+        return history
+
+    def remember(self, event: dict) -> None:
+        self.history(event["user_id"]).append(event)
+
+    @staticmethod
+    def reset_queue(queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESET_EVENT)
+
+    def dispatch(self, event: dict) -> None:
+        self.remember(event)
+        for queue in self._subscribers.get(event["user_id"], ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.overflows += 1
+                self.reset_queue(queue)
+            else:
+                self.delivered += 1
+
+    def reset(self) -> None:
+        self._history.clear()
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self.reset_queue(queue)
+
+    def replay(self, user_id: int, last_event_id: str) -> list:
+        history = self._history.get(user_id)
+        if history is None:
+            return [RESET_EVENT]
+        events = list(history.events)
+        if last_event_id == history.start:
+            return events
+        for index, event in enumerate(events):
+            if event["id"] == last_event_id:
+                return events[index + 1:]
+        return [RESET_EVENT]
+
+    def latest_id(self, user_id: int) -> str:
+        return self.history(user_id).latest_id()
+
+    async def stream(self, user_id: int, last_event_id: Optional[str] = None):
+        queue = asyncio.Queue(self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        deadline = time.monotonic() + self.stream_lifetime
+        position = last_event_id or self.latest_id(user_id)
+        try:
+            yield f"retry: {self.retry}\n\n"
+            if last_event_id is not None:
+                for event in self.replay(user_id, last_event_id):
+                    position = event["id"] or self.latest_id(user_id)
+                    yield format_event(event)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), min(self.heartbeat, remaining))
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                else:
+                    position = event["id"] or self.latest_id(user_id)
+                    yield format_event(event)
+            while not queue.empty():
+                event = queue.get_nowait()
+                position = event["id"] or self.latest_id(user_id)
+                yield format_event(event)
+            yield f"id: {position}\n\n"
+        finally:
+            subscribers = self._subscribers[user_id]
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "subscribers": sum(map(len, self._subscribers.values())),
+            "users": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+            "publish_errors": self.publish_errors,
+        }
+
+
+def get_event_backend():
+    url = os.getenv("TODO_EVENTS_URL")
+    if url and url.startswith(("postgres://", "postgresql")):
+        return PostgresEventBackend(url, float(
+            os.getenv("TODO_EVENTS_RECONNECT_INTERVAL", "5")))
+    return LocalEventBackend()
+
+
+todo_events = TodoEventBroker(
+    backend=get_event_backend(),
+    history_size=int(os.getenv("TODO_EVENTS_HISTORY_SIZE", "100")),
+    history_users=int(os.getenv("TODO_EVENTS_HISTORY_USERS", "10000")),
+    queue_size=int(os.getenv("TODO_EVENTS_QUEUE_SIZE", "100")),
+    heartbeat=float(os.getenv("TODO_EVENTS_HEARTBEAT", "15")),
+    stream_lifetime=float(os.getenv("TODO_EVENTS_STREAM_LIFETIME", "30")),
+    retry=int(os.getenv("TODO_EVENTS_RETRY_MS", "1000")),
+)
@@ -0,0 +1,66 @@
+from typing import Optional
+
+from sqlalchemy import delete, false, func, not_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_dir.db_models import Todos
+
+
+def owned_todo(statement, owner_id: int, todo_id: int):
+    return statement.where(Todos.id == todo_id) \
+        .where(Todos.owner_id == owner_id)
+
+
+async def select_todo_key(connection, owner_id: int, todo_id: int):
+    return (await connection.execute(owned_todo(
+        select(Todos.priority, Todos.completed), owner_id, todo_id))).first()
+
+
+async def update_owned_todo(
+    db: AsyncSession, owner_id: int, todo_id: int, values: dict
+) -> Optional[tuple]:
+    connection = await db.connection()
+    if connection.dialect.full_returning:
+        old = owned_todo(
+            select(Todos.id, Todos.priority, Todos.completed),
+            owner_id, todo_id).with_for_update().subquery("old")
+        result = await connection.execute(
+            update(Todos).where(Todos.id == old.c.id).values(values)
+            .returning(old.c.priority, old.c.completed))
+        return result.first()
+    old = await select_todo_key(connection, owner_id, todo_id)
+    if old is not None:
+        await connection.execute(
+            owned_todo(update(Todos), owner_id, todo_id).values(values))
+    return old
+
+
+async def toggle_owned_todo(
+    db: AsyncSession, owner_id: int, todo_id: int
+) -> Optional[tuple]:
+    connection = await db.connection()
+    statement = owned_todo(update(Todos), owner_id, todo_id).values(
+        completed=not_(func.coalesce(Todos.completed, false())))
+    if connection.dialect.full_returning:
+        result = await connection.execute(
+            statement.returning(Todos.priority, Todos.completed))
+        return result.first()
+    result = await connection.execute(statement)
+    if result.rowcount == 0:
+        return None
+    return await select_todo_key(connection, owner_id, todo_id)
+
+
+async def delete_owned_todo(
+    db: AsyncSession, owner_id: int, todo_id: int
+) -> Optional[tuple]:
+    connection = await db.connection()
+    statement = owned_todo(delete(Todos), owner_id, todo_id)
+    if connection.dialect.full_returning:
+        result = await connection.execute(
+            statement.returning(Todos.priority, Todos.completed))
+        return result.first()
+    old = await select_todo_key(connection, owner_id, todo_id)
+    if old is not None:
+        await connection.execute(statement)
+    return old
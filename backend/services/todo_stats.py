@@ -0,0 +1,105 @@
+from collections import Counter
+
+from sqlalchemy import delete, false, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_dir.db_models import TodoCounts, Todos
+
+PRIORITIES = range(1, 6)
+UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def count_key(priority, completed) -> tuple:
+    return priority or 0, bool(completed)
+
+
+def todo_key(todo) -> tuple:
+    return count_key(todo.priority, todo.completed)
+
+
+async def upsert_counts(db: AsyncSession, rows: list) -> None:
+    upsert = UPSERT_DIALECTS[db.bind.dialect.name]
+    statement = upsert(TodoCounts).values(rows)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[
+            TodoCounts.owner_id, TodoCounts.priority, TodoCounts.completed],
+        set_={"todo_count":
+              TodoCounts.todo_count + statement.excluded.todo_count}
+    ))
+
+
+async def update_counts(db: AsyncSession, rows: list) -> None:
+    for row in rows:
+        result = await db.execute(
+            update(TodoCounts)
+            .where(TodoCounts.owner_id == row["owner_id"])
+            .where(TodoCounts.priority == row["priority"])
+            .where(TodoCounts.completed == row["completed"])
+            .values(todo_count=TodoCounts.todo_count + row["todo_count"]))
+        if result.rowcount == 0:
+            await db.execute(insert(TodoCounts).values(row))
+
+
+async def record_todo_changes(
+    db: AsyncSession, owner_id: int, added=(), removed=()
+) -> None:
+    deltas = Counter()
+    for key in added:
+        deltas[count_key(*key)] += 1
+    for key in removed:
+        deltas[count_key(*key)] -= 1
+    rows = [
+        {
+            "owner_id": owner_id,
+            "priority": priority,
+            "completed": completed,
+            "todo_count": delta,
+        }
+        for (priority, completed), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    if db.bind.dialect.name in UPSERT_DIALECTS:
+        await upsert_counts(db, rows)
+    else:
+        await update_counts(db, rows)
+
+
+async def get_todo_stats(db: AsyncSession, owner_id: int) -> dict:
+    rows = await db.execute(
+        select(TodoCounts.priority, TodoCounts.completed,
+               TodoCounts.todo_count)
+        .where(TodoCounts.owner_id == owner_id))
+    stats = {
+        "total": 0,
+        "open": 0,
+        "completed": 0,
+        "by_priority": {str(priority): 0 for priority in PRIORITIES},
+    }
+    for priority, completed, todo_count in rows:
+        stats["total"] += todo_count
+        stats["completed" if completed else "open"] += todo_count
+        if priority:
+            stats["by_priority"][str(priority)] = \
+                stats["by_priority"].get(str(priority), 0) + todo_count
+    return stats
+
+
+async def reconcile_todo_counts(db: AsyncSession, owner_id=None) -> int:
+    priority = func.coalesce(Todos.priority, 0)
+    completed = func.coalesce(Todos.completed, false())
+    counts = select(Todos.owner_id, priority, completed, func.count())\
+        .where(Todos.owner_id.is_not(None))\
+        .group_by(Todos.owner_id, priority, completed)
+    clear = delete(TodoCounts)
+    if owner_id is not None:
+        counts = counts.where(Todos.owner_id == owner_id)
+        clear = clear.where(TodoCounts.owner_id == owner_id)
+    await db.execute(clear)
+    result = await db.execute(insert(TodoCounts).from_select(
+        ["owner_id", "priority", "completed", "todo_count"], counts))
+    return result.rowcount
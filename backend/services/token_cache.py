@@ -0,0 +1,74 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+from jose import jwt
+
+from settings import env_flag
+
+
+class TokenCache:
+    def __init__(self, max_size: int, enabled: bool) -> None:
+        self.max_size = max_size
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str):
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def set(self, token: str, payload: dict) -> None:
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        key = self._key(token)
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+token_cache = TokenCache(
+    max_size=int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+    enabled=env_flag("TOKEN_CACHE_ENABLED", "true"),
+)
+
+
+def decode_access_token(token: str, secret_key: str, algorithm: str) -> dict:
+    if not token_cache.enabled:
+        return jwt.decode(token, secret_key, algorithms=[algorithm])
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+        token_cache.set(token, payload)
+    return payload
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_dir.db import Session
+from db_dir.db_models import RevokedTokens
+
+logger = logging.getLogger(__name__)
+
+TOKEN_LIFETIME = timedelta(minutes=200)
+
+
+class TokenRevocationList:
+    def __init__(
+        self,
+        sync_interval: float,
+        sync_overlap: float,
+        reconcile_interval: float,
+        prune_interval: float
+    ) -> None:
+        self.sync_interval = sync_interval
+        self.sync_overlap = sync_overlap
+        self.reconcile_interval = reconcile_interval
+        self.prune_interval = prune_interval
+        self.synced_at = 0.0
+        self.synced_rows = 0
+        self.reconciled_at = 0.0
+        self.pruned_at = 0.0
+        self.checks = 0
+        self.rejections = 0
+        self._jtis = {}
+        self._cutoffs = {}
+        self._task = None
+
+    def is_revoked(self, payload: dict) -> bool:
+        self.checks += 1
+        revoked = payload.get("jti") in self._jtis
+        cutoff = self._cutoffs.get(payload.get("id"))
+        if not revoked and cutoff is not None:
+            revoked = payload.get("iat", 0) < cutoff[0]
+        if revoked:
+            self.rejections += 1
+        return revoked
+
+    def remember(self, row: RevokedTokens) -> None:
+        if row.jti is not None:
+            self._jtis[row.jti] = row.expires_at
+        if row.user_id is not None and row.issued_before is not None:
+            issued_before, _ = self._cutoffs.get(row.user_id, (0, 0))
+            if row.issued_before >= issued_before:
+                self._cutoffs[row.user_id] = (
+                    row.issued_before, row.expires_at)
+
+    def forget_expired(self, now: float) -> None:
+        self._jtis = {
+            jti: expires_at for jti, expires_at in self._jtis.items()
+            if expires_at > now
+        }
+        self._cutoffs = {
+            user_id: cutoff for user_id, cutoff in self._cutoffs.items()
+            if cutoff[1] > now
+        }
+
+    async def revoke_token(self, db: AsyncSession, payload: dict) -> None:
+        if payload.get("jti") is None:
+            await self.revoke_user_tokens(db, payload["id"])
+            return
+        row = RevokedTokens(
+            jti=payload["jti"], user_id=payload.get("id"),
+            expires_at=payload["exp"], created_at=time.time())
+        db.add(row)
+        self.remember(row)
+
+    async def revoke_user_tokens(self, db: AsyncSession, user_id: int) -> None:
+        now = time.time()
+        row = RevokedTokens(
+            user_id=user_id, issued_before=now,
+            expires_at=now + TOKEN_LIFETIME.total_seconds(), created_at=now)
+        db.add(row)
+        self.remember(row)
+
+    async def sync(self, db: AsyncSession) -> None:
+        now = time.time()
+        query = select(
+            RevokedTokens.jti, RevokedTokens.user_id,
+            RevokedTokens.issued_before, RevokedTokens.expires_at
+        ).where(RevokedTokens.expires_at > now)
+        reconcile = now - self.reconciled_at >= self.reconcile_interval
+        if not reconcile:
+            query = query.where(
+                RevokedTokens.created_at > self.synced_at - self.sync_overlap)
+        rows = (await db.execute(query)).all()
+        for row in rows:
+            self.remember(row)
+        self.synced_at = now
+        self.synced_rows = len(rows)
+        if reconcile:
+            self.reconciled_at = now
+        if now - self.pruned_at >= self.prune_interval:
+            self.forget_expired(now)
+            await db.execute(
+                delete(RevokedTokens).where(RevokedTokens.expires_at <= now))
+            await db.commit()
+            self.pruned_at = now
+
+    async def _sync_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                async with Session() as db:
+                    await self.sync(db)
+            except Exception:
+                logger.exception("Could not sync the token revocation list")
+
+    async def start(self) -> None:
+        async with Session() as db:
+            await self.sync(db)
+        self._task = asyncio.create_task(self._sync_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "revoked_tokens": len(self._jtis),
+            "revoked_users": len(self._cutoffs),
+            "synced_rows": self.synced_rows,
+            "checks": self.checks,
+            "rejections": self.rejections,
+        }
+
+
+token_revocations = TokenRevocationList(
+    sync_interval=float(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", "1")),
+    sync_overlap=float(os.getenv("TOKEN_REVOCATION_SYNC_OVERLAP", "60")),
+    reconcile_interval=float(
+        os.getenv("TOKEN_REVOCATION_RECONCILE_INTERVAL", "600")),
+    prune_interval=float(os.getenv("TOKEN_REVOCATION_PRUNE_INTERVAL", "3600")),
+)
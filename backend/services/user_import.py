@@ -0,0 +1,143 @@
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db_dir.db_models import Users
+from db_dir.pydantic_models import CreateUser
+from services.passwords import hash_password
+
+USER_COLUMNS = (
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "phone_number",
+    "hashed_password",
+    "is_active",
+    "is_admin",
+)
+LOOKUP_CHUNK_SIZE = 1000
+
+
+def read_rows(path: str, file_format: str):
+    with open(path, newline="") as source:
+        if file_format == "csv":
+            for line, row in enumerate(csv.DictReader(source), start=2):
+                yield line, {
+                    key: value or None for key, value in row.items()}
+        else:
+            for line, raw in enumerate(source, start=1):
+                if raw.strip():
+                    try:
+                        yield line, json.loads(raw)
+                    except ValueError as error:
+                        yield line, error
+
+
+def validate_rows(rows) -> tuple:
+    users, errors = [], []
+    usernames, emails = set(), set()
+    for line, row in rows:
+        if isinstance(row, ValueError):
+            errors.append((line, None, f"invalid JSON: {row}"))
+            continue
+        try:
+            user = CreateUser.parse_obj(row)
+        except (ValidationError, TypeError) as error:
+            errors.append((line, None, str(error).replace("\n", " ")))
+            continue
+        if user.username in usernames:
+            errors.append((line, user.username, "duplicate username in file"))
+        elif user.email is not None and user.email in emails:
+            errors.append((line, user.username, "duplicate email in file"))
+        else:
+            usernames.add(user.username)
+            if user.email is not None:
+                emails.add(user.email)
+            users.append((line, user))
+    return users, errors
+
+
+async def find_taken(db: AsyncSession, users: list) -> tuple:
+    taken_usernames, taken_emails = set(), set()
+    for start in range(0, len(users), LOOKUP_CHUNK_SIZE):
+        chunk = [user for _, user in users[start:start + LOOKUP_CHUNK_SIZE]]
+        usernames = [user.username for user in chunk]
+        emails = [user.email for user in chunk if user.email is not None]
+        rows = await db.execute(select(Users.username, Users.email).where(
+            or_(Users.username.in_(usernames), Users.email.in_(emails))))
+        for username, email in rows:
+            taken_usernames.add(username)
+            taken_emails.add(email)
+    return taken_usernames, taken_emails
+
+
+def hash_passwords(passwords: list, workers: int) -> list:
+    if not passwords:
+        return []
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(hash_password, passwords, chunksize=chunksize))
+
+
+async def insert_batch(db: AsyncSession, rows: list) -> None:
+    connection = await db.connection()
+    if connection.dialect.name == "postgresql":
+        import asyncpg
+        raw_connection = await connection.get_raw_connection()
+        try:
+            await raw_connection.driver_connection.copy_records_to_table(
+                Users.__tablename__, columns=USER_COLUMNS,
+                records=[tuple(row[column] for column in USER_COLUMNS)
+                         for row in rows])
+        except asyncpg.IntegrityConstraintViolationError as error:
+            raise IntegrityError("COPY users", None, error)
+    else:
+        await connection.execute(insert(Users), rows)
+
+
+async def import_users(
+    db: AsyncSession,
+    path: str,
+    file_format: str,
+    batch_size: int = 5000,
+    workers: int = os.cpu_count() or 1
+) -> tuple:
+    users, errors = validate_rows(read_rows(path, file_format))
+    taken_usernames, taken_emails = await find_taken(db, users)
+    accepted = []
+    for line, user in users:
+        if user.username in taken_usernames:
+            errors.append((line, user.username, "username already taken"))
+        elif user.email is not None and user.email in taken_emails:
+            errors.append((line, user.username, "email already taken"))
+        else:
+            accepted.append((line, user))
+
+    hashed = hash_passwords([user.password for _, user in accepted], workers)
+    imported = 0
+    for start in range(0, len(accepted), batch_size):
+        batch = accepted[start:start + batch_size]
+        rows = [
+            dict(user.dict(exclude={"password"}), hashed_password=password,
+                 is_active=True, is_admin=False)
+            for (_, user), password in zip(
+                batch, hashed[start:start + batch_size])
+        ]
+        try:
+            await insert_batch(db, rows)
+            await db.commit()
+            imported += len(rows)
+        except IntegrityError as error:
+            await db.rollback()
+            message = str(error.orig).replace("\n", " ")
+            errors.extend(
+                (line, user.username, f"batch rejected: {message}")
+                for line, user in batch)
+    return imported, sorted(errors, key=lambda error: error[0])